@@ -1,6 +1,9 @@
 package configs
 
-import "regexp"
+import (
+	"os"
+	"regexp"
+)
 
 var SafeRegex = regexp.MustCompile(`[^a-zA-Z0-9 ._-]`)
 
@@ -18,6 +21,20 @@ const (
 	NumVideoWorkers    = 3 // Number of concurrent video processing workers
 )
 
+// Shared with the authModule storage proxy (STORAGE_PROXY_SECRET there). Uploads
+// are only accepted with it, since they trust the proxy's X-User-Id as the owner.
+var ProxySecret = os.Getenv("STORAGE_PROXY_SECRET")
+
+// Loopback by default: clients go through the authModule proxy, never straight here
+var ListenAddr = getEnv("STORAGE_LISTEN_ADDR", "127.0.0.1:8080")
+
+func getEnv(key, fallback string) string {
+	if value := os.Getenv(key); value != "" {
+		return value
+	}
+	return fallback
+}
+
 var AllowedTypes = map[string]bool{
 	// --- IMAGES ---
 	"image/jpeg":    true, // .jpg, .jpeg
@@ -75,12 +75,15 @@ func main() {
 	v1.HandleFunc("/folder/delete/{id}", route.DeleteFolderHandler).Methods("DELETE")
 	// Create Share Link
 	v1.HandleFunc("/file/share/{id}", route.CreateShareLinkHandler).Methods("POST")
+	if config.ProxySecret == "" {
+		log.Println("STORAGE_PROXY_SECRET is not set: video uploads will be rejected")
+	}
 	//	 Start Message
-	fmt.Println("Storage Engine v1.0.0 is running on :8080")
+	fmt.Println("Storage Engine v1.0.0 is running on", config.ListenAddr)
 
 	// 4. Start Server with CORS Middleware
 	// We wrap the router 'r' with enableCORS
-	if err := http.ListenAndServe(":8080", enableCORS(r)); err != nil {
+	if err := http.ListenAndServe(config.ListenAddr, enableCORS(r)); err != nil {
 		log.Fatal(err)
 	}
 }
@@ -2,6 +2,7 @@ package routes
 
 import (
 	"crypto/sha256"
+	"crypto/subtle"
 	"encoding/hex"
 	"fmt"
 	"io"
@@ -17,8 +18,26 @@ import (
 	database "storageEngine/database"
 )
 
+// proxyUserID returns the uploader set by the authModule storage proxy from the
+// validated service ticket. X-User-Id is only trusted alongside the shared secret.
+func proxyUserID(r *http.Request) (string, bool) {
+	if config.ProxySecret == "" {
+		return "", false
+	}
+	secret := r.Header.Get("X-Proxy-Secret")
+	if subtle.ConstantTimeCompare([]byte(secret), []byte(config.ProxySecret)) != 1 {
+		return "", false
+	}
+	userID := r.Header.Get("X-User-Id")
+	return userID, userID != ""
+}
+
 func VideoUploadHandler(w http.ResponseWriter, r *http.Request) {
-	userID := "fcee8517-8c07-406f-bf8f-9d11295a223c" // Mock User
+	userID, ok := proxyUserID(r)
+	if !ok {
+		http.Error(w, "Unauthorized", http.StatusUnauthorized)
+		return
+	}
 	if r.Method != http.MethodPost {
 		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
 		return
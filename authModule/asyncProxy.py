@@ -0,0 +1,200 @@
+"""
+Asyncio storage proxy: the /api/storage routes from routes/storageProxy.py
+served by aiohttp with non-blocking I/O to the Go StorageEngine.
+A long HLS stream or slow upload holds a coroutine instead of a Flask
+worker thread, so one process can relay thousands of transfers at once.
+
+Run next to the Flask app and route /api/storage/* to it:
+    python asyncProxy.py            # listens on ASYNC_PROXY_PORT (5001)
+
+Same service ticket check, ownership check and per-user quota (USER_RATE_LIMITS,
+counted in the shared RATELIMIT_STORAGE_URI) as the Flask routes. Unlike them it
+has no media cache (MEDIA_CACHE_*): every segment and image is fetched from the
+StorageEngine, so put an HTTP cache in front of it if that load matters.
+"""
+
+import asyncio
+import logging
+from aiohttp import web, ClientSession, ClientTimeout, TCPConnector, ClientError
+from limits.storage import storage_from_string
+from sqlalchemy import create_engine
+from env import EnvConfig
+from utils.tokenManagement import validate_service_ticket_cached
+from utils.ownershipIndex import OwnershipIndex
+from utils.identityLimiter import IdentityRateLimiter, ServiceRoleCache, parse_role_limits
+from utils.storageProtocol import (
+    SERVICE_NAME,
+    FORWARD_REQUEST_HEADERS,
+    FORWARD_RESPONSE_HEADERS,
+    HLS_CONTENT_TYPES,
+)
+import utils.rateLimitStorage  # registers the denycache+ storage schemes
+
+log = logging.getLogger("authModule.asyncProxy")
+
+CLIENT_SESSION = web.AppKey("client_session", ClientSession)
+
+# Own engine: there is no Flask app context here
+_engine = create_engine(EnvConfig.SQLALCHEMY_DATABASE_URI, **EnvConfig.SQLALCHEMY_ENGINE_OPTIONS)
+ownership_index = OwnershipIndex(
+    get_engine=lambda: _engine,
+    maxsize=EnvConfig.OWNERSHIP_INDEX_SIZE,
+    refresh_interval=EnvConfig.OWNERSHIP_REFRESH_INTERVAL
+)
+
+# Same quotas and storage keys as extensions.user_limiter, so both proxies share one budget per user
+_limit_storage = storage_from_string(EnvConfig.RATELIMIT_STORAGE_URI)
+user_limiter = IdentityRateLimiter(
+    "user",
+    parse_role_limits(EnvConfig.USER_RATE_LIMITS),
+    get_storage=lambda: _limit_storage,
+    sync_interval=EnvConfig.IDENTITY_RATE_LIMIT_SYNC_INTERVAL,
+    maxsize=EnvConfig.IDENTITY_RATE_LIMIT_BUCKETS,
+    key_prefix=EnvConfig.RATELIMIT_KEY_PREFIX
+)
+service_roles = ServiceRoleCache(
+    get_engine=lambda: _engine,
+    maxsize=EnvConfig.IDENTITY_RATE_LIMIT_BUCKETS,
+    ttl=EnvConfig.SERVICE_ROLE_CACHE_TTL
+)
+
+
+@web.middleware
+async def require_service_ticket(request, handler):
+    ticket = request.headers.get("X-Service-Ticket")
+    ticket_data = validate_service_ticket_cached(ticket, SERVICE_NAME)
+    if not ticket_data:
+        return web.json_response({"error": "Unauthorized"}, status=401)
+    request["ticket"] = ticket_data
+    loop = asyncio.get_running_loop()
+
+    user_id = ticket_data["user_id"]
+    role = await loop.run_in_executor(None, service_roles.role_for, user_id, SERVICE_NAME)
+    retry_after = user_limiter.hit(user_id, role)
+    if retry_after:
+        log.warning("User rate limit exceeded", extra={"user_id": user_id, "role": role, "api_endpoint": request.path})
+        return web.json_response({"error": "Rate limit exceeded"}, status=429, headers={"Retry-After": str(retry_after)})
+
+    object_id = request.match_info.get("video_id") or request.match_info.get("image_id")
+    if object_id and EnvConfig.STORAGE_ENFORCE_OWNERSHIP:
+        # Cache hits are memory lookups; misses query the DB, so keep them off the loop
+        allowed = await loop.run_in_executor(
+            None, ownership_index.is_allowed, user_id, object_id
+        )
+        if not allowed:
+            log.warning("Storage object access denied: %s", object_id)
+            return web.json_response({"error": "Forbidden"}, status=403)
+
+    try:
+        return await handler(request)
+    except TimeoutError:
+        log.error("StorageEngine timed out: %s", request.path)
+        return web.json_response({"error": "Storage service timed out"}, status=504)
+    except ClientError as e:
+        log.error("StorageEngine request failed: %s", e)
+        return web.json_response({"error": "Storage service unavailable"}, status=502)
+
+
+async def _proxy_get(request, path, default_content_type="application/octet-stream"):
+    headers = {h: request.headers[h] for h in FORWARD_REQUEST_HEADERS if h in request.headers}
+    session = request.app[CLIENT_SESSION]
+
+    async with session.get(f"{EnvConfig.STORAGE_BASE_URL}{path}", headers=headers) as upstream:
+        response = web.StreamResponse(
+            status=upstream.status,
+            headers={h: upstream.headers[h] for h in FORWARD_RESPONSE_HEADERS if h in upstream.headers}
+        )
+        response.content_type = upstream.content_type if "Content-Type" in upstream.headers else default_content_type
+        await response.prepare(request)
+
+        # write() waits for the client socket to drain, so slow viewers pace the upstream read
+        try:
+            async for chunk in upstream.content.iter_chunked(EnvConfig.STORAGE_STREAM_CHUNK_SIZE):
+                await response.write(chunk)
+        except (ClientError, TimeoutError) as e:
+            # Headers are already sent; all we can do is cut the body short
+            log.error("StorageEngine stream broke mid-transfer: %s", e)
+            return response
+        await response.write_eof()
+        return response
+
+
+async def proxy_stream(request):
+    filename = request.match_info["filename"]
+    extension = filename[filename.rfind("."):].lower() if "." in filename else ""
+    return await _proxy_get(
+        request,
+        f"/api/v1/video/{request.match_info['video_id']}/{filename}",
+        default_content_type=HLS_CONTENT_TYPES.get(extension, "application/octet-stream")
+    )
+
+
+async def proxy_image(request):
+    return await _proxy_get(request, f"/api/v1/image/{request.match_info['image_id']}")
+
+
+async def proxy_upload(request):
+    sent = 0
+    next_report = EnvConfig.STORAGE_UPLOAD_PROGRESS_BYTES
+
+    async def body():
+        nonlocal sent, next_report
+        async for chunk in request.content.iter_chunked(EnvConfig.STORAGE_UPLOAD_CHUNK_SIZE):
+            sent += len(chunk)
+            if sent >= next_report:
+                log.info("Upload progress: %s of %s bytes", sent, request.content_length or 'unknown', extra={"sample": True})
+                next_report += EnvConfig.STORAGE_UPLOAD_PROGRESS_BYTES
+            yield chunk
+
+    headers = {
+        "Content-Type": request.headers.get("Content-Type", "application/octet-stream"),
+        "X-User-Id": request["ticket"]["user_id"]  # recorded as the owner by the StorageEngine
+    }
+    if request.content_length is not None:
+        headers["Content-Length"] = str(request.content_length)
+
+    session = request.app[CLIENT_SESSION]
+    async with session.post(
+        f"{EnvConfig.STORAGE_BASE_URL}/api/v1/video/upload",
+        data=body(),
+        headers=headers
+    ) as upstream:
+        payload = await upstream.read()
+        log.info("Upload forwarded: %s bytes", sent)
+        return web.Response(
+            body=payload,
+            status=upstream.status,
+            content_type=upstream.content_type,
+            headers={"X-Upload-Bytes": str(sent)}
+        )
+
+
+async def _client_session(app):
+    connector = TCPConnector(limit=EnvConfig.ASYNC_PROXY_POOL_SIZE, keepalive_timeout=30)
+    timeout = ClientTimeout(
+        connect=EnvConfig.STORAGE_CONNECT_TIMEOUT,
+        sock_read=EnvConfig.STORAGE_READ_TIMEOUT
+    )
+    # auto_decompress off: bytes are relayed still encoded so Content-Length stays valid
+    headers = {"X-Proxy-Secret": EnvConfig.STORAGE_PROXY_SECRET} if EnvConfig.STORAGE_PROXY_SECRET else None
+    app[CLIENT_SESSION] = ClientSession(connector=connector, timeout=timeout, headers=headers, auto_decompress=False)
+    yield
+    await app[CLIENT_SESSION].close()
+
+
+def create_async_proxy():
+    app = web.Application(
+        middlewares=[require_service_ticket],
+        client_max_size=0  # bodies are streamed, never read whole
+    )
+    app.cleanup_ctx.append(_client_session)
+    app.router.add_post("/api/storage/upload", proxy_upload)
+    app.router.add_get("/api/storage/video/{video_id}/{filename}", proxy_stream)
+    app.router.add_get("/api/storage/image/{image_id}", proxy_image)
+    return app
+
+
+if __name__ == "__main__":
+    from utils.logging import setup_logging
+    setup_logging()
+    web.run_app(create_async_proxy(), port=EnvConfig.ASYNC_PROXY_PORT)
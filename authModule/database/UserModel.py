@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, Index
 from datetime import datetime, timezone
-from app import db
+from extensions import db
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -14,15 +14,17 @@ class UserModel(db.Model):
     passwordHash = Column(String(200), nullable=False)
     email = Column(String(200), nullable=False, unique=True, index=True)
     createdAt = Column(
-        String(200),
+        db.DateTime(timezone=True),
         nullable=True,
-        default=lambda: datetime.now(timezone.utc).isoformat(),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=db.func.now(),
     )
     updatedAt = Column(
-        String(200),
+        db.DateTime(timezone=True),
         nullable=True,
-        onupdate=lambda: datetime.now(timezone.utc).isoformat(),
-        default=lambda: datetime.now(timezone.utc).isoformat(),
+        onupdate=lambda: datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=db.func.now(),
     )
 
     def __repr__(self):
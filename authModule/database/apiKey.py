@@ -1,12 +1,27 @@
 from sqlalchemy import Column, Integer, String, Index
 from datetime import datetime, timezone
-from app import db
+from extensions import db
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
 
 class ApiKey(db.Model):
     __tablename__ = "api_keys"
+    __table_args__ = (
+        # /list by user, newest first
+        Index("ix_api_keys_user_created", "user_id", "created_at", "id"),
+        Index("ix_api_keys_service_id", "service_id"),
+        # Only non-revoked keys are ever validated or checked for duplicates
+        Index(
+            "ix_api_keys_active_user_service", "user_id", "service_id",
+            postgresql_where=db.text("revoked = false")
+        ),
+        # Legacy scan for keys issued before fingerprints (shrinks to nothing over time)
+        Index(
+            "ix_api_keys_legacy_unfingerprinted", "id",
+            postgresql_where=db.text("key_fingerprint IS NULL AND revoked = false")
+        ),
+    )
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = db.Column(
@@ -24,12 +39,15 @@ class ApiKey(db.Model):
     )
 
     hashed_key = db.Column(db.String(255), nullable=False)  # Argon2 hash
+    # HMAC-SHA256 of the raw key, used for indexed lookup (NULL for legacy keys)
+    key_fingerprint = db.Column(db.String(64), nullable=True, unique=True, index=True)
     role = db.Column(db.String(50), nullable=False)  # inherited from UserService
     scopes = db.Column(db.JSON, default=list)  # ["read", "write"]
 
     revoked = db.Column(db.Boolean, default=False)
     expires_at = db.Column(db.DateTime, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # NOT NULL: /list pages on (created_at, id)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     user = db.relationship("UserModel", backref="api_keys")
     service = db.relationship("ServicesModel", backref="api_keys")
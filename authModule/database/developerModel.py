@@ -1,6 +1,6 @@
 from sqlalchemy import Column, ForeignKey, Integer, String, Index
 from datetime import datetime, timezone
-from app import db
+from extensions import db
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, ForeignKey, Integer, String, Index
 from datetime import datetime, timezone
-from app import db
+from extensions import db
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -11,15 +11,17 @@ class OrganizationModel(db.Model):
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(50), nullable=False)
     createdAt = Column(
-        String(200),
+        db.DateTime(timezone=True),
         nullable=True,
-        default=lambda: datetime.now(timezone.utc).isoformat(),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=db.func.now(),
     )
     updatedAt = Column(
-        String(200),
+        db.DateTime(timezone=True),
         nullable=True,
-        onupdate=lambda: datetime.now(timezone.utc).isoformat(),
-        default=lambda: datetime.now(timezone.utc).isoformat(),
+        onupdate=lambda: datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=db.func.now(),
     )
 
     def __repr__(self):
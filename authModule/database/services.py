@@ -1,6 +1,6 @@
 from sqlalchemy import Column, ForeignKey, Integer, String, Index, Enum as SqlEnum
 from datetime import datetime, timezone
-from app import db
+from extensions import db
 from enum import Enum
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -14,6 +14,10 @@ class UserRoleEnum(Enum):
 
 class ServicesModel(db.Model):
     __tablename__ = "services_table"
+    __table_args__ = (
+        # Service names are unique within an organization (create_service upserts on this)
+        Index("uq_services_organization_name", "organizationId", "name", unique=True),
+    )
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
@@ -22,12 +26,15 @@ class ServicesModel(db.Model):
     role = Column(SqlEnum(UserRoleEnum), nullable=False, default=UserRoleEnum.User)
 
     createdAt = Column(
-        String(200), default=lambda: datetime.now(timezone.utc).isoformat()
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=db.func.now(),
     )
     updatedAt = Column(
-        String(200),
-        default=lambda: datetime.now(timezone.utc).isoformat(),
-        onupdate=lambda: datetime.now(timezone.utc).isoformat(),
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=db.func.now(),
     )
 
     organizationId = Column(
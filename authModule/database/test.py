@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String
-from app import db 
+from extensions import db
 
 class testModel(db.Model):
     __tablename__ = 'test_table'
@@ -1,12 +1,17 @@
 from sqlalchemy import Column, Integer, String, Index
 from datetime import datetime, timezone
-from app import db
+from extensions import db
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
 
 class UserService(db.Model):
     __tablename__ = "user_services"
+    __table_args__ = (
+        # One assignment per user and service; also serves every (user_id, service_id) lookup
+        Index("uq_user_services_user_service", "user_id", "service_id", unique=True),
+        Index("ix_user_services_service_id", "service_id"),
+    )
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
@@ -1,10 +1,13 @@
 import base64
+import os
 from functools import wraps
 from flask import request, jsonify
 
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import hashes
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 from encryption.loadKeys import load_private_key
 
@@ -75,3 +78,28 @@ def encrypt(plain_text: str) -> str:
 
 def decrypt(cipher_text: str) -> str:
     return _fernet.decrypt(cipher_text.encode()).decode()
+
+
+# ==================================================
+# AEAD (AES-256-GCM) FOR COMPACT TICKETS
+# ==================================================
+
+# Separate key derived from the master key so Fernet and AES-GCM never share key material
+_aead = AESGCM(HKDF(
+    algorithm=hashes.SHA256(),
+    length=32,
+    salt=None,
+    info=b"kerberos-ticket-aead-v2",
+).derive(base64.urlsafe_b64decode(_KERBEROS_MASTER_KEY)))
+
+AEAD_NONCE_SIZE = 12
+
+
+def aead_encrypt(plain: bytes, associated_data: bytes) -> bytes:
+    """Returns nonce || ciphertext || tag"""
+    nonce = os.urandom(AEAD_NONCE_SIZE)
+    return nonce + _aead.encrypt(nonce, plain, associated_data)
+
+
+def aead_decrypt(sealed: bytes, associated_data: bytes) -> bytes:
+    return _aead.decrypt(sealed[:AEAD_NONCE_SIZE], sealed[AEAD_NONCE_SIZE:], associated_data)
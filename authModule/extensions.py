@@ -1,13 +1,52 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import logging
+from utils.auditWriter import AuditWriter
+from utils.identityLimiter import IdentityRateLimiter, ServiceRoleCache, parse_role_limits
+import utils.rateLimitStorage  # registers the denycache+ storage schemes
+from env import EnvConfig
 
+# Single registry of Flask extensions; bound to the app in app.create_app()
 db = SQLAlchemy()
+migrate = Migrate()
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"]
-)
+# Storage, strategy and key prefix come from the RATELIMIT_* settings in EnvConfig.
+# No default_limits: per-IP limits are set on each route that needs one
+# (register, login, key management). Ticket issuance (/api/keys/tgs) and the
+# storage proxy are limited per user by user_limiter instead, since many
+# clients can share one IP behind NAT or a gateway.
+limiter = Limiter(key_func=get_remote_address)
 
 log = logging.getLogger("authModule")
+
+audit_writer = AuditWriter(
+    capacity=EnvConfig.AUDIT_BUFFER_SIZE,
+    batch_size=EnvConfig.AUDIT_BATCH_SIZE,
+    flush_interval=EnvConfig.AUDIT_FLUSH_INTERVAL
+)
+
+# Quotas per API key / per authenticated user, on top of the per-IP limits above
+api_key_limiter = IdentityRateLimiter(
+    "apikey",
+    parse_role_limits(EnvConfig.API_KEY_RATE_LIMITS),
+    get_storage=lambda: limiter.storage,
+    sync_interval=EnvConfig.IDENTITY_RATE_LIMIT_SYNC_INTERVAL,
+    maxsize=EnvConfig.IDENTITY_RATE_LIMIT_BUCKETS,
+    key_prefix=EnvConfig.RATELIMIT_KEY_PREFIX
+)
+user_limiter = IdentityRateLimiter(
+    "user",
+    parse_role_limits(EnvConfig.USER_RATE_LIMITS),
+    get_storage=lambda: limiter.storage,
+    sync_interval=EnvConfig.IDENTITY_RATE_LIMIT_SYNC_INTERVAL,
+    maxsize=EnvConfig.IDENTITY_RATE_LIMIT_BUCKETS,
+    key_prefix=EnvConfig.RATELIMIT_KEY_PREFIX
+)
+service_roles = ServiceRoleCache(
+    get_engine=lambda: current_app.extensions["sqlalchemy"].engine,
+    maxsize=EnvConfig.IDENTITY_RATE_LIMIT_BUCKETS,
+    ttl=EnvConfig.SERVICE_ROLE_CACHE_TTL
+)
@@ -0,0 +1,33 @@
+"""add api key fingerprint
+
+Revision ID: 3f9a2c1d7b10
+Revises: 
+Create Date: 2026-10-18 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a2c1d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables may have been created by db.create_all() with the column already present
+    columns = [c['name'] for c in sa.inspect(op.get_bind()).get_columns('api_keys')]
+    if 'key_fingerprint' in columns:
+        return
+
+    # Existing rows stay NULL: they are found by the legacy scan in
+    # validate_api_key and backfilled on their first successful validation.
+    op.add_column('api_keys', sa.Column('key_fingerprint', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_api_keys_key_fingerprint'), 'api_keys', ['key_fingerprint'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_api_keys_key_fingerprint'), table_name='api_keys')
+    op.drop_column('api_keys', 'key_fingerprint')
@@ -0,0 +1,154 @@
+"""composite indexes and timestamptz createdAt/updatedAt
+
+Revision ID: 8c41e7a2d5f3
+Revises: 3f9a2c1d7b10
+Create Date: 2026-10-18 15:10:00.000000
+
+Built to run against a live database:
+- indexes are created CONCURRENTLY (outside a transaction), so writes
+  to api_keys / user_services are never blocked;
+- createdAt/updatedAt are converted by expand / backfill / swap instead of
+  ALTER COLUMN ... TYPE, which would rewrite each table under an ACCESS
+  EXCLUSIVE lock. A trigger keeps the new column current while the
+  backfill runs in small committed batches; the swap itself only renames
+  columns and is bounded by lock_timeout.
+
+uq_user_services_user_service makes (user_id, service_id) unique. Existing
+duplicate assignments are not removed automatically, since their roles
+and enabled flags may differ. Resolve them by hand before upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41e7a2d5f3'
+down_revision = '3f9a2c1d7b10'
+branch_labels = None
+depends_on = None
+
+TIMESTAMP_TABLES = ('user_table', 'services_table', 'organization_table')
+TIMESTAMP_COLUMNS = ('createdAt', 'updatedAt')
+BACKFILL_BATCH_SIZE = 5000
+
+# (name, table, columns, unique, where)
+INDEXES = (
+    ('ix_api_keys_user_created', 'api_keys', '(user_id, created_at, id)', False, None),
+    ('ix_api_keys_service_id', 'api_keys', '(service_id)', False, None),
+    ('ix_api_keys_active_user_service', 'api_keys', '(user_id, service_id)', False, 'revoked = false'),
+    ('ix_api_keys_legacy_unfingerprinted', 'api_keys', '(id)', False,
+     'key_fingerprint IS NULL AND revoked = false'),
+    ('uq_user_services_user_service', 'user_services', '(user_id, service_id)', True, None),
+    ('ix_user_services_service_id', 'user_services', '(service_id)', False, None),
+)
+
+
+def _needs_conversion(bind, table):
+    # Fresh databases built by db.create_all() already have timestamptz columns
+    columns = {c['name']: c['type'] for c in sa.inspect(bind).get_columns(table)}
+    return isinstance(columns.get('createdAt'), sa.String)
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    duplicates = bind.execute(sa.text("""
+        SELECT user_id, service_id, count(*)
+        FROM user_services
+        GROUP BY user_id, service_id
+        HAVING count(*) > 1
+    """)).fetchall()
+    if duplicates:
+        listed = ", ".join(f"({user_id}, {service_id}) {count}x" for user_id, service_id, count in duplicates)
+        raise RuntimeError(
+            f"Duplicate user_services rows must be resolved before uq_user_services_user_service can be built: {listed}"
+        )
+
+    tables = [table for table in TIMESTAMP_TABLES if _needs_conversion(bind, table)]
+
+    # 1. Expand: nullable columns without defaults are a catalog-only change
+    for table in tables:
+        for column in TIMESTAMP_COLUMNS:
+            op.add_column(table, sa.Column(f'{column}_tz', sa.DateTime(timezone=True), nullable=True))
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_sync_timestamptz() RETURNS trigger AS $$
+            BEGIN
+                NEW."createdAt_tz" := NULLIF(NEW."createdAt", '')::timestamptz;
+                NEW."updatedAt_tz" := NULLIF(NEW."updatedAt", '')::timestamptz;
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_sync_timestamptz
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {table}_sync_timestamptz()
+        """)
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # 2. Backfill existing rows in primary-key order, one commit per batch
+        for table in tables:
+            last_id = None
+            while True:
+                row = bind.execute(sa.text(f"""
+                    WITH batch AS (
+                        SELECT id FROM {table}
+                        WHERE (CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid))
+                        ORDER BY id
+                        LIMIT :batch_size
+                    ), updated AS (
+                        UPDATE {table} t
+                        SET "createdAt_tz" = NULLIF(t."createdAt", '')::timestamptz,
+                            "updatedAt_tz" = NULLIF(t."updatedAt", '')::timestamptz
+                        FROM batch
+                        WHERE t.id = batch.id
+                        RETURNING t.id
+                    )
+                    SELECT CAST(max(id::text) AS uuid) AS last_id, count(*) AS n FROM updated
+                """), {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}).one()
+                if not row.n:
+                    break
+                last_id = str(row.last_id)
+
+        # 3. Indexes, built without blocking writes. A failed concurrent build
+        #    leaves an INVALID index behind, so drop it first to allow re-runs.
+        for name, table, columns, unique, where in INDEXES:
+            existing = bind.execute(sa.text("""
+                SELECT i.indisvalid
+                FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = :name
+            """), {"name": name}).scalar()
+            if existing is True:
+                continue
+            if existing is False:
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+            op.execute(
+                f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY {name} ON {table} {columns}'
+                + (f' WHERE {where}' if where else '')
+            )
+
+    # 4. Swap: short metadata-only changes; give up instead of queueing behind long transactions
+    if tables:
+        op.execute("SET LOCAL lock_timeout = '5s'")
+    for table in tables:
+        op.execute(f'DROP TRIGGER {table}_sync_timestamptz ON {table}')
+        op.execute(f'DROP FUNCTION {table}_sync_timestamptz()')
+        for column in TIMESTAMP_COLUMNS:
+            op.drop_column(table, column)
+            op.alter_column(table, f'{column}_tz', new_column_name=column, server_default=sa.text('now()'))
+
+
+def downgrade():
+    for name, table, columns, unique, where in reversed(INDEXES):
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    # Back to ISO text; rewrites the tables, acceptable for a rollback
+    for table in TIMESTAMP_TABLES:
+        for column in TIMESTAMP_COLUMNS:
+            op.alter_column(
+                table, column,
+                type_=sa.String(length=200),
+                server_default=None,
+                postgresql_using=f'to_char("{column}" AT TIME ZONE \'UTC\', \'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"\')'
+            )
@@ -0,0 +1,56 @@
+"""unique service name per organization
+
+Revision ID: b7d3f19e6a42
+Revises: 8c41e7a2d5f3
+Create Date: 2026-10-18 16:20:00.000000
+
+create_service inserts with ON CONFLICT ("organizationId", name), which
+needs this unique index. Built CONCURRENTLY so services_table stays
+writable. Existing duplicates are not merged automatically: API keys and
+user assignments hang off each service row, so they have to be resolved
+by hand before the upgrade can proceed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3f19e6a42'
+down_revision = '8c41e7a2d5f3'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'uq_services_organization_name'
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    duplicates = bind.execute(sa.text("""
+        SELECT "organizationId", name, count(*)
+        FROM services_table
+        GROUP BY "organizationId", name
+        HAVING count(*) > 1
+    """)).fetchall()
+    if duplicates:
+        listed = ", ".join(f"{name!r} in {organization_id} ({count}x)" for organization_id, name, count in duplicates)
+        raise RuntimeError(f"Duplicate service names must be merged before {INDEX_NAME} can be built: {listed}")
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        valid = bind.execute(sa.text("""
+            SELECT i.indisvalid
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name
+        """), {"name": INDEX_NAME}).scalar()
+        if valid is True:
+            return
+        if valid is False:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+        op.execute(
+            f'CREATE UNIQUE INDEX CONCURRENTLY {INDEX_NAME} ON services_table ("organizationId", name)'
+        )
+
+
+def downgrade():
+    op.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
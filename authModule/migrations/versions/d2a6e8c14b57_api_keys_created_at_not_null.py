@@ -0,0 +1,49 @@
+"""api_keys.created_at NOT NULL
+
+Revision ID: d2a6e8c14b57
+Revises: b7d3f19e6a42
+Create Date: 2026-10-18 17:05:00.000000
+
+/api/apikeys/list pages on (created_at, id), so created_at must never be
+NULL. Rows without one get the epoch, which lists them as the oldest keys.
+SET NOT NULL normally scans the table under an ACCESS EXCLUSIVE lock; a
+CHECK constraint validated beforehand (under a weaker lock) lets Postgres
+skip that scan.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6e8c14b57'
+down_revision = 'b7d3f19e6a42'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # Small committed batches, so no long-running transaction holds row locks
+        while True:
+            updated = bind.execute(sa.text("""
+                UPDATE api_keys SET created_at = 'epoch'
+                WHERE id IN (SELECT id FROM api_keys WHERE created_at IS NULL LIMIT :batch_size)
+            """), {"batch_size": BACKFILL_BATCH_SIZE}).rowcount
+            if not updated:
+                break
+
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute(
+        "ALTER TABLE api_keys ADD CONSTRAINT ck_api_keys_created_at_not_null "
+        "CHECK (created_at IS NOT NULL) NOT VALID"
+    )
+    op.execute("ALTER TABLE api_keys VALIDATE CONSTRAINT ck_api_keys_created_at_not_null")
+    op.alter_column('api_keys', 'created_at', nullable=False)
+    op.execute("ALTER TABLE api_keys DROP CONSTRAINT ck_api_keys_created_at_not_null")
+
+
+def downgrade():
+    op.alter_column('api_keys', 'created_at', nullable=True)
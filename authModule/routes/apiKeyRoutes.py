@@ -1,16 +1,31 @@
 from flask import Blueprint, request, jsonify
-from app import db, log, limiter
+from werkzeug.exceptions import HTTPException
+from extensions import db, log, limiter, audit_writer, api_key_limiter
 from database.apiKey import ApiKey
 from database.services import ServicesModel
 from database.userServices import UserService
 from database.UserModel import UserModel
-from utils.passwordHashing import hashPassword, ph, verifyPassword
+from utils.passwordHashing import hashPassword, bulkHashingJob, ph, verifyPassword, verifyPasswords, PasswordPoolBusy
+from utils.apiKeys import fingerprint_api_key
+from utils.ttlCache import TTLCache
+from utils.pagination import page_size, encode_cursor, decode_cursor
+from utils.adminAuth import admin_required
+from env import EnvConfig
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload
+import uuid
 import secrets
 import datetime
 
 apiKeyRoute = Blueprint('apiKeyRoute', __name__)
 
+# key fingerprint -> validation result, so repeat validations skip Argon2 and the DB
+validated_key_cache = TTLCache(
+    maxsize=EnvConfig.API_KEY_CACHE_SIZE,
+    ttl=EnvConfig.API_KEY_CACHE_TTL
+)
+
 
 @apiKeyRoute.route('/health', methods=['GET'])
 def apikey_health():
@@ -20,7 +35,9 @@ def apikey_health():
 
 @apiKeyRoute.errorhandler(Exception)
 def handle_apikey_route_error(e):
-    log.error(f"Error in apiKeyRoute: {str(e)}")
+    if isinstance(e, HTTPException):
+        return e  # keep 429s from the limiter (and other HTTP errors) as they are
+    log.error("Error in apiKeyRoute: %s", e)
     return jsonify({"error": "An error occurred in apiKeyRoute"}), 500
 
 
@@ -93,6 +110,7 @@ def generate_api_key():
         
         # Hash the API key before storing
         hashed_key = hashPassword(raw_api_key)
+        key_fingerprint = fingerprint_api_key(raw_api_key)
 
         # Calculate expiration
         expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=expires_in_days)
@@ -102,6 +120,7 @@ def generate_api_key():
             user_id=user_id,
             service_id=service_id,
             hashed_key=hashed_key,
+            key_fingerprint=key_fingerprint,
             role=user_service.role,
             scopes=scopes,
             expires_at=expires_at,
@@ -110,8 +129,9 @@ def generate_api_key():
 
         db.session.add(new_api_key)
         db.session.commit()
+        audit_writer.record(new_api_key.id, "created", request.remote_addr)
 
-        log.info(f"API key generated for user {user.email} and service {service.name}", extra={
+        log.info("API key generated for user %s and service %s", user.email, service.name, extra={
             "user_id": str(user_id),
             "service_id": str(service_id),
             "api_key_id": str(new_api_key.id),
@@ -129,28 +149,155 @@ def generate_api_key():
             "warning": "Store this API key securely. It will not be shown again."
         }), 201
 
+    except PasswordPoolBusy:
+        db.session.rollback()
+        log.warning("Password hashing pool saturated", extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+        return jsonify({"error": "Server is busy, please retry shortly"}), 503, {"Retry-After": "1"}
     except IntegrityError as e:
         db.session.rollback()
-        log.error(f"Database integrity error: {str(e)}", extra={
+        log.error("Database integrity error: %s", e, extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
         return jsonify({"error": "Database integrity error"}), 400
     except Exception as e:
         db.session.rollback()
-        log.error(f"Error generating API key: {str(e)}", extra={
+        log.error("Error generating API key: %s", e, extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
         return jsonify({"error": "An error occurred while generating API key"}), 500
 
 
+@apiKeyRoute.route('/generate/bulk', methods=['POST'])
+@limiter.exempt  # admin-only; one call replaces one /generate call per user
+@admin_required
+def generate_api_keys_bulk():
+    """
+    Issue one API key per user for a service, in one transaction
+    Expected JSON payload:
+    {
+        "serviceId": "service-uuid",
+        "userIds": ["user-uuid", ...],  # or "allAssigned": true
+        "scopes": ["read", "write"],  # optional
+        "expiresInDays": 30  # optional, default 30 days
+    }
+    Only users with an enabled assignment to the service get a key; the rest
+    are returned in notAssigned.
+    """
+    try:
+        data = request.get_json()
+        scopes = data.get('scopes', ["read", "write"])
+        expires_in_days = data.get('expiresInDays', 30)
+        user_ids = data.get('userIds') or []
+        all_assigned = data.get('allAssigned') is True
+        try:
+            service_id = uuid.UUID(str(data.get('serviceId')))
+            user_ids = [uuid.UUID(str(user_id)) for user_id in user_ids]
+            expires_in_days = int(expires_in_days)
+        except (ValueError, TypeError):
+            return jsonify({"error": "serviceId and userIds must be UUIDs, expiresInDays a number"}), 400
+        if not user_ids and not all_assigned:
+            return jsonify({"error": "userIds or allAssigned is required"}), 400
+        if len(user_ids) > EnvConfig.BULK_API_KEY_MAX:
+            return jsonify({"error": f"At most {EnvConfig.BULK_API_KEY_MAX} keys per call"}), 400
+
+        service = db.session.get(ServicesModel, service_id)
+        if not service:
+            return jsonify({"error": "Service not found"}), 404
+
+        # Eligible users and their roles in one query
+        eligible = db.session.query(UserService.user_id, UserService.role).filter(
+            UserService.service_id == service_id,
+            UserService.enabled.is_(True)
+        )
+        if user_ids:
+            eligible = eligible.filter(UserService.user_id.in_(user_ids))
+        eligible = eligible.order_by(UserService.user_id).limit(EnvConfig.BULK_API_KEY_MAX + 1).all()
+        if len(eligible) > EnvConfig.BULK_API_KEY_MAX:
+            return jsonify({
+                "error": f"More than {EnvConfig.BULK_API_KEY_MAX} assigned users; pass userIds in smaller groups"
+            }), 400
+        eligible_ids = {user_id for user_id, _ in eligible}
+        not_assigned = [str(user_id) for user_id in user_ids if user_id not in eligible_ids]
+
+        raw_api_keys = [secrets.token_urlsafe(32) for _ in eligible]
+        hashed_keys = []
+        if raw_api_keys:
+            # Argon2 per key is the bulk of the cost; hash in parallel on the shared bulk pool
+            with bulkHashingJob() as job:
+                hashed_keys = job.hash(raw_api_keys)
+
+        expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=expires_in_days)
+        created_at = datetime.datetime.utcnow()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "service_id": service_id,
+                "hashed_key": hashed_key,
+                "key_fingerprint": fingerprint_api_key(raw_api_key),
+                "role": role,
+                "scopes": scopes,
+                "expires_at": expires_at,
+                "created_at": created_at,
+                "revoked": False
+            }
+            for (user_id, role), raw_api_key, hashed_key in zip(eligible, raw_api_keys, hashed_keys)
+        ]
+        if rows:
+            # executemany; SQLAlchemy sends it as multi-row INSERTs
+            db.session.execute(ApiKey.__table__.insert(), rows)
+        db.session.commit()
+        for row in rows:
+            audit_writer.record(row["id"], "created", request.remote_addr)
+
+        log.info("%s API keys issued for service %s", len(rows), service.name, extra={
+            "service_id": str(service_id),
+            "issued": len(rows),
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+
+        return jsonify({
+            "message": "API keys generated successfully",
+            "issued": len(rows),
+            "keys": [
+                {"userId": str(row["user_id"]), "apiKeyId": str(row["id"]), "apiKey": raw_api_key}  # Only returned once!
+                for row, raw_api_key in zip(rows, raw_api_keys)
+            ],
+            "notAssigned": not_assigned,
+            "serviceName": service.name,
+            "scopes": scopes,
+            "expiresAt": expires_at.isoformat(),
+            "warning": "Store these API keys securely. They will not be shown again."
+        }), 201
+
+    except PasswordPoolBusy:
+        db.session.rollback()
+        log.warning("Bulk API key issuance rejected: another bulk job is running", extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+        return jsonify({"error": "Another bulk job is running, please retry later"}), 503, {"Retry-After": "60"}
+    except Exception as e:
+        db.session.rollback()
+        log.error("Error generating API keys in bulk: %s", e, extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+        return jsonify({"error": "An error occurred while generating API keys"}), 500
+
+
 @apiKeyRoute.route('/list', methods=['GET'])
 @limiter.limit("30 per minute")
 def list_api_keys():
     """
-    List API keys for a user
-    Query parameter: userId
+    List API keys for a user, newest first
+    Query parameters: userId, limit (optional), cursor (nextCursor of the previous page)
     """
     try:
         user_id = request.args.get('userId')
@@ -158,13 +305,31 @@ def list_api_keys():
         if not user_id:
             return jsonify({"error": "userId query parameter is required"}), 400
 
+        try:
+            limit = page_size(request.args.get('limit'))
+            cursor = request.args.get('cursor')
+            if cursor:
+                created_at, key_id = decode_cursor(cursor, 2)
+                after = (datetime.datetime.fromisoformat(created_at), uuid.UUID(key_id))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor or limit"}), 400
+
         # Verify user exists
         user = UserModel.query.filter_by(id=user_id).first()
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        # Get all API keys for this user
-        api_keys = ApiKey.query.filter_by(user_id=user_id).all()
+        # One page in (created_at, id) order, walking ix_api_keys_user_created;
+        # service names come in the same query instead of one lazy load per key
+        query = ApiKey.query.options(joinedload(ApiKey.service)).filter(ApiKey.user_id == user_id)
+        if cursor:
+            query = query.filter(tuple_(ApiKey.created_at, ApiKey.id) < after)
+        api_keys = query.order_by(ApiKey.created_at.desc(), ApiKey.id.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(api_keys) > limit:
+            api_keys = api_keys[:limit]
+            next_cursor = encode_cursor(api_keys[-1].created_at.isoformat(), api_keys[-1].id)
 
         api_keys_list = [{
             "id": str(api_key.id),
@@ -178,7 +343,7 @@ def list_api_keys():
             "isExpired": api_key.expires_at < datetime.datetime.utcnow() if api_key.expires_at else False
         } for api_key in api_keys]
 
-        log.info(f"Listed {len(api_keys_list)} API keys for user {user.email}", extra={
+        log.info("Listed %s API keys for user %s", len(api_keys_list), user.email, extra={
             "user_id": str(user_id),
             "ip": request.remote_addr,
             "api_endpoint": request.path
@@ -186,11 +351,12 @@ def list_api_keys():
 
         return jsonify({
             "apiKeys": api_keys_list,
-            "count": len(api_keys_list)
+            "count": len(api_keys_list),
+            "nextCursor": next_cursor
         }), 200
 
     except Exception as e:
-        log.error(f"Error listing API keys: {str(e)}", extra={
+        log.error("Error listing API keys: %s", e, extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
@@ -215,7 +381,12 @@ def revoke_api_key(api_key_id):
         api_key.revoked = True
         db.session.commit()
 
-        log.info(f"API key revoked", extra={
+        if api_key.key_fingerprint:
+            validated_key_cache.pop(api_key.key_fingerprint)
+        _mark_revoked(api_key.id)
+        audit_writer.record(api_key.id, "revoked", request.remote_addr)
+
+        log.info("API key revoked", extra={
             "api_key_id": str(api_key_id),
             "user_id": str(api_key.user_id),
             "service_id": str(api_key.service_id),
@@ -230,7 +401,7 @@ def revoke_api_key(api_key_id):
 
     except Exception as e:
         db.session.rollback()
-        log.error(f"Error revoking API key: {str(e)}", extra={
+        log.error("Error revoking API key: %s", e, extra={
             "api_key_id": api_key_id,
             "ip": request.remote_addr,
             "api_endpoint": request.path
@@ -238,6 +409,127 @@ def revoke_api_key(api_key_id):
         return jsonify({"error": "An error occurred while revoking API key"}), 500
 
 
+def _find_api_key(raw_api_key, key_fingerprint):
+    """
+    Resolve a raw API key to its non-revoked ApiKey row.
+    One indexed lookup on key_fingerprint plus a single Argon2 verify.
+    """
+    # service and user are read right after for the response; load them in the same query
+    api_key = ApiKey.query.options(
+        joinedload(ApiKey.service),
+        joinedload(ApiKey.user)
+    ).filter_by(key_fingerprint=key_fingerprint, revoked=False).first()
+    if api_key:
+        return api_key if verifyPassword(api_key.hashed_key, raw_api_key) else None
+
+    return _find_legacy_api_key(raw_api_key, key_fingerprint)
+
+
+def _find_legacy_api_key(raw_api_key, key_fingerprint):
+    """
+    Keys issued before fingerprints existed fall back to a scan over the
+    rows that still have no fingerprint, and are backfilled on first match
+    so the legacy set shrinks to nothing over time.
+    """
+    if not EnvConfig.API_KEY_LEGACY_LOOKUP:
+        return None
+
+    # Legacy keys (no fingerprint yet)
+    legacy_keys = ApiKey.query.filter(
+        ApiKey.key_fingerprint.is_(None),
+        ApiKey.revoked.is_(False)
+    ).all()
+
+    for legacy_key in legacy_keys:
+        try:
+            if verifyPassword(legacy_key.hashed_key, raw_api_key):
+                legacy_key.key_fingerprint = key_fingerprint
+                db.session.commit()
+                log.info("Backfilled fingerprint for legacy API key", extra={
+                    "api_key_id": str(legacy_key.id)
+                })
+                return legacy_key
+        except PasswordPoolBusy:
+            raise
+        except Exception as e:
+            db.session.rollback()
+            log.debug("Failed to verify API key: %s", e)
+            continue
+
+    return None
+
+
+def _revocation_marker(api_key_id):
+    return f"{EnvConfig.RATELIMIT_KEY_PREFIX}/apikey-revoked/{api_key_id}"
+
+
+def _mark_revoked(api_key_id):
+    """
+    Tell every worker that shares the limiter storage to stop serving this key
+    from its cache. The marker outlives any cache entry (API_KEY_CACHE_TTL).
+    """
+    try:
+        limiter.storage.incr(_revocation_marker(api_key_id), EnvConfig.API_KEY_CACHE_TTL)
+    except Exception as e:
+        log.error("Could not publish API key revocation: %s", e, extra={"api_key_id": str(api_key_id)})
+
+
+def _cached_validation(key_fingerprint):
+    """Cached result for a key, unless it was revoked on any worker since it was cached"""
+    cached_result = validated_key_cache.get(key_fingerprint)
+    if not cached_result:
+        return None
+    try:
+        revoked = limiter.storage.get(_revocation_marker(cached_result["apiKeyId"])) > 0
+    except Exception:
+        revoked = True  # shared store unreachable: fall back to the database
+    if revoked:
+        validated_key_cache.pop(key_fingerprint)
+        return None
+    return cached_result
+
+
+def _is_expired(api_key):
+    return api_key.expires_at and api_key.expires_at < datetime.datetime.utcnow()
+
+
+def _cache_validation_result(api_key, key_fingerprint):
+    """Build the validation response for a matched key and cache it until the key expires"""
+    result = {
+        "valid": True,
+        "apiKeyId": str(api_key.id),
+        "userId": str(api_key.user_id),
+        "serviceId": str(api_key.service_id),
+        "serviceName": api_key.service.name,
+        "role": api_key.role,
+        "scopes": api_key.scopes,
+        "userEmail": api_key.user.email,
+        "userName": api_key.user.name
+    }
+
+    expires_at = None
+    if api_key.expires_at:
+        expires_at = api_key.expires_at.replace(tzinfo=datetime.timezone.utc).timestamp()
+    validated_key_cache.set(key_fingerprint, result, expires_at=expires_at)
+
+    return result
+
+
+def _api_key_rate_limited(result, retry_after):
+    """429 for a valid key that has used up its role's quota"""
+    log.warning("API key rate limit exceeded", extra={
+        "api_key_id": result["apiKeyId"],
+        "role": result["role"],
+        "ip": request.remote_addr,
+        "api_endpoint": request.path
+    })
+    return jsonify({
+        "valid": False,
+        "error": "API key rate limit exceeded",
+        "retryAfter": retry_after
+    }), 429, {"Retry-After": str(retry_after)}
+
+
 @apiKeyRoute.route('/validate', methods=['POST'])
 @limiter.limit("100 per minute")
 def validate_api_key():
@@ -267,21 +559,17 @@ def validate_api_key():
                 "error": "API key is required in body or Authorization header"
             }), 400
 
-        # Get all non-revoked API keys
-        api_keys = ApiKey.query.filter_by(revoked=False).all()
-
-        # Try to match the provided key with stored hashed keys
-        matched_key = None
-        for api_key in api_keys:
-            try:
-                # Verify the raw key against stored hash
-                if verifyPassword(api_key.hashed_key, raw_api_key):
-                    matched_key = api_key
-                    break
-            except (ValueError, Exception) as e:
-                # Log the exception but continue checking other keys
-                log.debug(f"Failed to verify API key: {str(e)}")
-                continue
+        key_fingerprint = fingerprint_api_key(raw_api_key)
+
+        cached_result = _cached_validation(key_fingerprint)
+        if cached_result:
+            retry_after = api_key_limiter.hit(cached_result["apiKeyId"], cached_result["role"])
+            if retry_after:
+                return _api_key_rate_limited(cached_result, retry_after)
+            audit_writer.record(cached_result["apiKeyId"], "used", request.remote_addr)
+            return jsonify(cached_result), 200
+
+        matched_key = _find_api_key(raw_api_key, key_fingerprint)
 
         if not matched_key:
             log.warning("Invalid API key provided", extra={
@@ -294,7 +582,8 @@ def validate_api_key():
             }), 401
 
         # Check if expired
-        if matched_key.expires_at and matched_key.expires_at < datetime.datetime.utcnow():
+        if _is_expired(matched_key):
+            audit_writer.record(matched_key.id, "failed_auth", request.remote_addr)
             log.warning("Expired API key used", extra={
                 "api_key_id": str(matched_key.id),
                 "ip": request.remote_addr,
@@ -306,20 +595,25 @@ def validate_api_key():
             }), 401
 
         # Return validation success with metadata
-        return jsonify({
-            "valid": True,
-            "apiKeyId": str(matched_key.id),
-            "userId": str(matched_key.user_id),
-            "serviceId": str(matched_key.service_id),
-            "serviceName": matched_key.service.name,
-            "role": matched_key.role,
-            "scopes": matched_key.scopes,
-            "userEmail": matched_key.user.email,
-            "userName": matched_key.user.name
-        }), 200
+        result = _cache_validation_result(matched_key, key_fingerprint)
+        retry_after = api_key_limiter.hit(result["apiKeyId"], result["role"])
+        if retry_after:
+            return _api_key_rate_limited(result, retry_after)
+        audit_writer.record(matched_key.id, "used", request.remote_addr)
 
+        return jsonify(result), 200
+
+    except PasswordPoolBusy:
+        log.warning("Password hashing pool saturated", extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+        return jsonify({
+            "valid": False,
+            "error": "Server is busy, please retry shortly"
+        }), 503, {"Retry-After": "1"}
     except Exception as e:
-        log.error(f"Error validating API key: {str(e)}", extra={
+        log.error("Error validating API key: %s", e, extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
@@ -327,3 +621,125 @@ def validate_api_key():
             "valid": False,
             "error": "An error occurred while validating API key"
         }), 500
+
+
+def _apply_api_key_quota(result):
+    """Charge a valid batch result to its key's quota; over-quota keys come back invalid"""
+    if not result["valid"]:
+        return result
+    retry_after = api_key_limiter.hit(result["apiKeyId"], result["role"])
+    if not retry_after:
+        return result
+    return {
+        "valid": False,
+        "error": "API key rate limit exceeded",
+        "rateLimited": True,
+        "retryAfter": retry_after
+    }
+
+
+@apiKeyRoute.route('/validate/batch', methods=['POST'])
+@limiter.limit("60 per minute")
+def validate_api_keys_batch():
+    """
+    Validate many API keys in one call
+    Expected JSON payload:
+    {
+        "apiKeys": ["raw-api-key-1", "raw-api-key-2", ...]
+    }
+    Returns one result per key, in input order, shaped like /validate responses.
+    Legacy keys without a fingerprint are reported invalid here (no per-key
+    legacy scan in batches); one /validate call backfills their fingerprint.
+    """
+    try:
+        data = request.get_json() or {}
+        raw_api_keys = data.get('apiKeys')
+
+        if not isinstance(raw_api_keys, list) or not raw_api_keys:
+            return jsonify({"error": "apiKeys must be a non-empty list"}), 400
+
+        if len(raw_api_keys) > EnvConfig.API_KEY_BATCH_MAX:
+            return jsonify({
+                "error": f"At most {EnvConfig.API_KEY_BATCH_MAX} API keys per batch"
+            }), 400
+
+        results = [None] * len(raw_api_keys)
+        pending = {}  # fingerprint -> (raw key, [input positions])
+
+        for position, raw_api_key in enumerate(raw_api_keys):
+            if not isinstance(raw_api_key, str) or not raw_api_key:
+                results[position] = {"valid": False, "error": "API key must be a non-empty string"}
+                continue
+
+            key_fingerprint = fingerprint_api_key(raw_api_key)
+            cached_result = _cached_validation(key_fingerprint)
+            if cached_result:
+                results[position] = _apply_api_key_quota(cached_result)
+                if results[position]["valid"]:
+                    audit_writer.record(cached_result["apiKeyId"], "used", request.remote_addr)
+                continue
+
+            pending.setdefault(key_fingerprint, (raw_api_key, []))[1].append(position)
+
+        if pending:
+            # One set-based query for every uncached key
+            api_keys = ApiKey.query.options(
+                joinedload(ApiKey.service),
+                joinedload(ApiKey.user)
+            ).filter(
+                ApiKey.key_fingerprint.in_(list(pending)),
+                ApiKey.revoked.is_(False)
+            ).all()
+
+            # Argon2 verification runs in parallel across the worker pool
+            verified = verifyPasswords([
+                (api_key.hashed_key, pending[api_key.key_fingerprint][0]) for api_key in api_keys
+            ])
+            matched = {
+                api_key.key_fingerprint: api_key
+                for api_key, ok in zip(api_keys, verified) if ok
+            }
+
+            for key_fingerprint, (raw_api_key, positions) in pending.items():
+                matched_key = matched.get(key_fingerprint)
+
+                if not matched_key:
+                    result = {"valid": False, "error": "Invalid API key"}
+                elif _is_expired(matched_key):
+                    result = {"valid": False, "error": "API key has expired"}
+                else:
+                    result = _cache_validation_result(matched_key, key_fingerprint)
+
+                for position in positions:
+                    results[position] = _apply_api_key_quota(result)
+                    if matched_key and not results[position].get("rateLimited"):
+                        audit_writer.record(
+                            matched_key.id,
+                            "used" if result["valid"] else "failed_auth",
+                            request.remote_addr
+                        )
+
+        valid_count = sum(1 for result in results if result["valid"])
+        log.info("Validated batch of %s API keys (%s valid)", len(results), valid_count, extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path,
+            "sample": True
+        })
+
+        return jsonify({
+            "results": results,
+            "count": len(results)
+        }), 200
+
+    except PasswordPoolBusy:
+        log.warning("Password hashing pool saturated", extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+        return jsonify({"error": "Server is busy, please retry shortly"}), 503, {"Retry-After": "1"}
+    except Exception as e:
+        log.error("Error validating API key batch: %s", e, extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+        return jsonify({"error": "An error occurred while validating API keys"}), 500
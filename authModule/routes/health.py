@@ -1,4 +1,8 @@
 from flask import Blueprint, jsonify 
+from extensions import db
+from extensions import audit_writer, api_key_limiter, user_limiter
+from utils.logging import get_logging_stats
+from utils.dbPool import pool_metrics
 
 
 health_bp = Blueprint('health', __name__)   
@@ -9,6 +13,42 @@ def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
+@health_bp.route('/health/audit', methods=['GET'])
+def audit_health():
+    """Audit writer counters (dropped > 0 means the buffer overflowed)"""
+    return jsonify(audit_writer.stats()), 200
+
+
+@health_bp.route('/health/logging', methods=['GET'])
+def logging_health():
+    """Log queue depth and records dropped on overflow"""
+    return jsonify(get_logging_stats()), 200
+
+
+@health_bp.route('/health/db', methods=['GET'])
+def db_pool_health():
+    """Connection pool occupancy and how long checkouts waited"""
+    pool = db.engine.pool
+    occupancy = {}
+    if hasattr(pool, "checkedout"):
+        occupancy = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow()
+        }
+    return jsonify({"pool": occupancy, "wait": pool_metrics.stats()}), 200
+
+
+@health_bp.route('/health/ratelimits', methods=['GET'])
+def ratelimit_health():
+    """Per-identity token bucket counters for this worker"""
+    return jsonify({
+        "apiKeys": api_key_limiter.stats(),
+        "users": user_limiter.stats()
+    }), 200
+
+
 
 
 
@@ -1,7 +1,7 @@
 from flask import Blueprint,request, jsonify
 from encryption.loadKeys import load_server_public_key
 from utils.tokenManagement import validate_tgt, create_service_ticket
-from app import log
+from extensions import log, user_limiter, service_roles
 
 
 keyExchange_bp = Blueprint('keyExchange', __name__)
@@ -23,7 +23,7 @@ def exchange_key():
 
     try:
         server_public_key = load_server_public_key() 
-        log.info("Server public key loaded successfully for key exchange.", extra={"endpoint": request.path, "method": request.method, "client_ip": request.remote_addr, "status": 200})
+        log.info("Server public key loaded successfully for key exchange.", extra={"endpoint": request.path, "method": request.method, "client_ip": request.remote_addr, "status": 200, "sample": True})
         return jsonify({"server_public_key": server_public_key}), 200
     except FileNotFoundError:
         return jsonify({"error": "Server public key not found"}), 500
@@ -42,6 +42,15 @@ def ticket_granting_service():
     if not tgt_data:
         return jsonify({"error": "Invalid or expired TGT"}), 403
 
+    role = service_roles.role_for(tgt_data["user_id"], service)
+    retry_after = user_limiter.hit(tgt_data["user_id"], role)
+    if retry_after:
+        log.warning(
+            "User rate limit exceeded",
+            extra={"user_id": tgt_data["user_id"], "service": service, "role": role}
+        )
+        return jsonify({"error": "Rate limit exceeded"}), 429, {"Retry-After": str(retry_after)}
+
     service_ticket = create_service_ticket(
         user_id=tgt_data["user_id"],
         service=service,
@@ -50,7 +59,7 @@ def ticket_granting_service():
 
     log.info(
         "Service ticket issued",
-        extra={"user_id": tgt_data["user_id"], "service": service}
+        extra={"user_id": tgt_data["user_id"], "service": service, "sample": True}
     )
 
     return jsonify({"service_ticket": service_ticket}), 200
@@ -1,10 +1,17 @@
 from flask import Blueprint, request, jsonify
-from app import db, log, limiter
-from database.services import ServicesModel
+from werkzeug.exceptions import HTTPException
+from extensions import db, log, limiter
+from database.services import ServicesModel, UserRoleEnum
 from database.organization import OrganizationModel
 from database.userServices import UserService
 from database.UserModel import UserModel
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert, UUID
+from sqlalchemy import tuple_, select, exists, literal, true, func, or_, String
+from utils.pagination import page_size, encode_cursor, decode_cursor
+from utils.adminAuth import admin_required
+from env import EnvConfig
+import uuid
 
 serviceRoute = Blueprint('serviceRoute', __name__)
 
@@ -17,10 +24,20 @@ def service_health():
 
 @serviceRoute.errorhandler(Exception)
 def handle_service_route_error(e):
-    log.error(f"Error in serviceRoute: {str(e)}")
+    if isinstance(e, HTTPException):
+        return e  # keep 429s from the limiter (and other HTTP errors) as they are
+    log.error("Error in serviceRoute: %s", e)
     return jsonify({"error": "An error occurred in serviceRoute"}), 500
 
 
+def _violated_foreign_key(error):
+    """Name of the foreign key constraint behind an IntegrityError, if that is what failed"""
+    orig = getattr(error, "orig", None)
+    if getattr(orig, "pgcode", None) != "23503":  # foreign_key_violation
+        return None
+    return orig.diag.constraint_name
+
+
 @serviceRoute.route('/create', methods=['POST'])
 @limiter.limit("10 per hour")
 def create_service():
@@ -56,23 +73,27 @@ def create_service():
             })
             return jsonify({"error": "Organization ID is required"}), 400
 
-        # Verify organization exists
-        organization = OrganizationModel.query.filter_by(id=organization_id).first()
-        if not organization:
-            log.warning("Organization not found", extra={
-                "organization_id": organization_id,
-                "ip": request.remote_addr,
-                "api_endpoint": request.path
-            })
-            return jsonify({"error": "Organization not found"}), 404
+        # Convert string role to enum
+        try:
+            role_enum = UserRoleEnum[role]
+        except KeyError:
+            role_enum = UserRoleEnum.User
 
-        # Check if service already exists for this organization
-        existing_service = ServicesModel.query.filter_by(
-            name=name,
-            organizationId=organization_id
-        ).first()
-        
-        if existing_service:
+        # One round trip: the (organizationId, name) unique index rejects
+        # duplicates and the organization FK rejects unknown organizations
+        new_service_id = db.session.execute(
+            insert(ServicesModel)
+            .values(name=name, description=description, role=role_enum, organizationId=organization_id)
+            .on_conflict_do_nothing(index_elements=[ServicesModel.organizationId, ServicesModel.name])
+            .returning(ServicesModel.id)
+        ).scalar()
+        db.session.commit()
+
+        if new_service_id is None:
+            existing_service = ServicesModel.query.filter_by(
+                name=name,
+                organizationId=organization_id
+            ).first()
             log.warning("Service already exists", extra={
                 "service_name": name,
                 "organization_id": organization_id,
@@ -81,31 +102,12 @@ def create_service():
             })
             return jsonify({
                 "error": "Service with this name already exists for this organization",
-                "service_id": str(existing_service.id)
+                "service_id": str(existing_service.id) if existing_service else None
             }), 409
 
-        # Create new service
-        from database.services import UserRoleEnum
-        
-        # Convert string role to enum
-        try:
-            role_enum = UserRoleEnum[role]
-        except KeyError:
-            role_enum = UserRoleEnum.User
-
-        new_service = ServicesModel(
-            name=name,
-            description=description,
-            role=role_enum,
-            organizationId=organization_id
-        )
-
-        db.session.add(new_service)
-        db.session.commit()
-
-        log.info(f"Service {name} created successfully", extra={
+        log.info("Service %s created successfully", name, extra={
             "service_name": name,
-            "service_id": str(new_service.id),
+            "service_id": str(new_service_id),
             "organization_id": organization_id,
             "ip": request.remote_addr,
             "api_endpoint": request.path
@@ -113,22 +115,29 @@ def create_service():
 
         return jsonify({
             "message": f"Service {name} created successfully",
-            "service_id": str(new_service.id),
-            "name": new_service.name,
-            "description": new_service.description,
-            "role": new_service.role.value
+            "service_id": str(new_service_id),
+            "name": name,
+            "description": description,
+            "role": role_enum.value
         }), 201
 
     except IntegrityError as e:
         db.session.rollback()
-        log.error(f"Database integrity error: {str(e)}", extra={
+        if _violated_foreign_key(e) == "fk_services_organization":
+            log.warning("Organization not found", extra={
+                "organization_id": organization_id,
+                "ip": request.remote_addr,
+                "api_endpoint": request.path
+            })
+            return jsonify({"error": "Organization not found"}), 404
+        log.error("Database integrity error: %s", e, extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
         return jsonify({"error": "Database integrity error"}), 400
     except Exception as e:
         db.session.rollback()
-        log.error(f"Error creating service: {str(e)}", extra={
+        log.error("Error creating service: %s", e, extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
@@ -139,16 +148,32 @@ def create_service():
 @limiter.limit("30 per minute")
 def list_services():
     """
-    List all services
-    Optional query parameter: organizationId
+    List services ordered by name
+    Optional query parameters: organizationId, limit, cursor (nextCursor of the previous page)
     """
     try:
         organization_id = request.args.get('organizationId')
 
+        try:
+            limit = page_size(request.args.get('limit'))
+            cursor = request.args.get('cursor')
+            if cursor:
+                name, service_id = decode_cursor(cursor, 2)
+                after = (name, uuid.UUID(service_id))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor or limit"}), 400
+
+        query = ServicesModel.query
         if organization_id:
-            services = ServicesModel.query.filter_by(organizationId=organization_id).all()
-        else:
-            services = ServicesModel.query.all()
+            query = query.filter_by(organizationId=organization_id)
+        if cursor:
+            query = query.filter(tuple_(ServicesModel.name, ServicesModel.id) > after)
+        services = query.order_by(ServicesModel.name, ServicesModel.id).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(services) > limit:
+            services = services[:limit]
+            next_cursor = encode_cursor(services[-1].name, services[-1].id)
 
         services_list = [{
             "id": str(service.id),
@@ -156,22 +181,23 @@ def list_services():
             "description": service.description,
             "role": service.role.value,
             "organizationId": str(service.organizationId),
-            "createdAt": service.createdAt,
-            "updatedAt": service.updatedAt
+            "createdAt": service.createdAt.isoformat() if service.createdAt else None,
+            "updatedAt": service.updatedAt.isoformat() if service.updatedAt else None
         } for service in services]
 
-        log.info(f"Listed {len(services_list)} services", extra={
+        log.info("Listed %s services", len(services_list), extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
 
         return jsonify({
             "services": services_list,
-            "count": len(services_list)
+            "count": len(services_list),
+            "nextCursor": next_cursor
         }), 200
 
     except Exception as e:
-        log.error(f"Error listing services: {str(e)}", extra={
+        log.error("Error listing services: %s", e, extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
@@ -199,12 +225,12 @@ def get_service(service_id):
             "description": service.description,
             "role": service.role.value,
             "organizationId": str(service.organizationId),
-            "createdAt": service.createdAt,
-            "updatedAt": service.updatedAt
+            "createdAt": service.createdAt.isoformat() if service.createdAt else None,
+            "updatedAt": service.updatedAt.isoformat() if service.updatedAt else None
         }), 200
 
     except Exception as e:
-        log.error(f"Error getting service: {str(e)}", extra={
+        log.error("Error getting service: %s", e, extra={
             "service_id": service_id,
             "ip": request.remote_addr,
             "api_endpoint": request.path
@@ -234,54 +260,204 @@ def assign_service_to_user():
         if not user_id or not service_id:
             return jsonify({"error": "userId and serviceId are required"}), 400
 
-        # Verify user exists
-        user = UserModel.query.filter_by(id=user_id).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-
-        # Verify service exists
-        service = ServicesModel.query.filter_by(id=service_id).first()
-        if not service:
-            return jsonify({"error": "Service not found"}), 404
-
-        # Check if already assigned
-        existing_assignment = UserService.query.filter_by(
-            user_id=user_id,
-            service_id=service_id
-        ).first()
+        # One round trip: the (user_id, service_id) unique index rejects repeat
+        # assignments and the foreign keys reject unknown users or services
+        new_assignment_id = db.session.execute(
+            insert(UserService)
+            .values(user_id=user_id, service_id=service_id, role=role, enabled=True)
+            .on_conflict_do_nothing(index_elements=[UserService.user_id, UserService.service_id])
+            .returning(UserService.id)
+        ).scalar()
+        db.session.commit()
 
-        if existing_assignment:
+        if new_assignment_id is None:
+            existing_assignment = UserService.query.filter_by(
+                user_id=user_id,
+                service_id=service_id
+            ).first()
             return jsonify({
                 "error": "Service already assigned to user",
-                "assignment_id": str(existing_assignment.id)
+                "assignment_id": str(existing_assignment.id) if existing_assignment else None
             }), 409
 
-        # Create assignment
-        new_assignment = UserService(
-            user_id=user_id,
-            service_id=service_id,
-            role=role,
-            enabled=True
+        log.info("Service %s assigned to user %s", service_id, user_id, extra={
+            "user_id": str(user_id),
+            "service_id": str(service_id),
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+
+        return jsonify({
+            "message": "Service assigned to user successfully",
+            "assignment_id": str(new_assignment_id)
+        }), 201
+
+    except IntegrityError as e:
+        db.session.rollback()
+        constraint = _violated_foreign_key(e)
+        if constraint == "fk_user_services_user":
+            return jsonify({"error": "User not found"}), 404
+        if constraint == "fk_user_services_service":
+            return jsonify({"error": "Service not found"}), 404
+        log.error("Database integrity error: %s", e, extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+        return jsonify({"error": "Database integrity error"}), 400
+    except Exception as e:
+        db.session.rollback()
+        log.error("Error assigning service to user: %s", e, extra={
+            "ip": request.remote_addr,
+            "api_endpoint": request.path
+        })
+        return jsonify({"error": "An error occurred while assigning the service"}), 500
+
+
+def _parse_uuid(value, field):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid {field}: {value}")
+
+
+def _bulk_user_filter(data):
+    """
+    WHERE clauses selecting the users of a bulk assignment, plus the explicit
+    userIds / emails to report as notMatched. Listed users match by id OR
+    email; query filters are ANDed onto that. Raises ValueError on bad input.
+    """
+    user_ids = data.get('userIds') or []
+    emails = data.get('emails') or []
+    query = data.get('query') or {}
+    if not isinstance(user_ids, list) or not isinstance(emails, list) or not isinstance(query, dict):
+        raise ValueError("userIds and emails must be lists and query an object")
+    if len(user_ids) + len(emails) > EnvConfig.BULK_ASSIGN_MAX:
+        raise ValueError(f"At most {EnvConfig.BULK_ASSIGN_MAX} userIds / emails per call")
+
+    listed = []
+    if user_ids:
+        user_ids = [_parse_uuid(user_id, "userId") for user_id in user_ids]
+        listed.append(UserModel.id.in_(user_ids))
+    if emails:
+        listed.append(UserModel.email.in_(emails))
+    conditions = [or_(*listed)] if listed else []
+    if query.get('emailDomain'):
+        conditions.append(UserModel.email.endswith(f"@{query['emailDomain']}", autoescape=True))
+    if query.get('organizationId'):
+        # Users already holding an enabled assignment in the organization (optionally with a role)
+        membership = (
+            select(UserService.id)
+            .join(ServicesModel, ServicesModel.id == UserService.service_id)
+            .where(
+                UserService.user_id == UserModel.id,
+                UserService.enabled.is_(True),
+                ServicesModel.organizationId == _parse_uuid(query['organizationId'], "organizationId")
+            )
         )
+        if query.get('role'):
+            membership = membership.where(UserService.role == query['role'])
+        conditions.append(exists(membership))
+    if not conditions:
+        raise ValueError("Provide userIds, emails or a query (emailDomain, organizationId, role)")
+    return conditions, user_ids, emails
+
+
+@serviceRoute.route('/assign/bulk', methods=['POST'])
+@limiter.exempt  # admin-only; one call replaces thousands of /assign calls
+@admin_required
+def bulk_assign_service():
+    """
+    Assign a service to many users in one transaction
+    Expected JSON payload:
+    {
+        "serviceId": "uuid-string",
+        "role": "Developer",                      # optional, default User
+        "userIds": ["uuid", ...],                 # and / or
+        "emails": ["dev@example.com", ...],       # and / or
+        "query": {"emailDomain": "example.com", "organizationId": "uuid", "role": "Developer"}
+    }
+    Users listed in userIds or emails are selected; every given query filter
+    must also match (without lists, the query alone selects the users).
+    Users already assigned are left unchanged.
+    At most BULK_ASSIGN_MAX users are assigned per call; while hasMore is true,
+    repeat the same call to assign the next ones.
+    """
+    try:
+        data = request.get_json()
+        role = data.get('role', 'User')
+        if role not in UserRoleEnum.__members__:
+            return jsonify({"error": f"role must be one of {', '.join(UserRoleEnum.__members__)}"}), 400
+        try:
+            service_id = _parse_uuid(data.get('serviceId'), "serviceId")
+            conditions, user_ids, emails = _bulk_user_filter(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        db.session.add(new_assignment)
+        if db.session.get(ServicesModel, service_id) is None:
+            return jsonify({"error": "Service not found"}), 404
+
+        # One INSERT ... SELECT: the users are never loaded into Python. Users
+        # already assigned are excluded before the LIMIT, so repeated calls make
+        # progress; the (user_id, service_id) unique index still guards races.
+        already_assigned = exists(
+            select(UserService.id).where(
+                UserService.user_id == UserModel.id,
+                UserService.service_id == service_id
+            )
+        )
+        matching_users = select(
+            func.gen_random_uuid(),
+            UserModel.id,
+            literal(service_id, UUID(as_uuid=True)),
+            literal(role, String),
+            true(),
+            func.timezone('utc', func.now())
+        ).where(*conditions, ~already_assigned).order_by(UserModel.id).limit(EnvConfig.BULK_ASSIGN_MAX)
+        assigned_user_ids = db.session.execute(
+            insert(UserService)
+            .from_select(
+                [UserService.id, UserService.user_id, UserService.service_id,
+                 UserService.role, UserService.enabled, UserService.created_at],
+                matching_users
+            )
+            .on_conflict_do_nothing(index_elements=[UserService.user_id, UserService.service_id])
+            .returning(UserService.user_id)
+        ).scalars().all()
+        # Anything still matching and unassigned is left for the next call
+        has_more = db.session.execute(
+            select(exists(select(UserModel.id).where(*conditions, ~already_assigned)))
+        ).scalar()
+
+        # Listed users that do not exist or fail the other criteria
+        not_matched = []
+        if user_ids or emails:
+            known = db.session.execute(
+                select(UserModel.id, UserModel.email).where(*conditions)
+            ).all()
+            known_ids = {row.id for row in known}
+            known_emails = {row.email for row in known}
+            not_matched = [str(user_id) for user_id in user_ids if user_id not in known_ids] \
+                + [email for email in emails if email not in known_emails]
         db.session.commit()
 
-        log.info(f"Service {service.name} assigned to user {user.email}", extra={
-            "user_id": str(user_id),
+        log.info("Service %s bulk-assigned to %s users", service_id, len(assigned_user_ids), extra={
             "service_id": str(service_id),
+            "assigned": len(assigned_user_ids),
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
 
         return jsonify({
-            "message": "Service assigned to user successfully",
-            "assignment_id": str(new_assignment.id)
+            "message": "Service assigned to users successfully",
+            "assigned": len(assigned_user_ids),
+            "assignedUserIds": [str(user_id) for user_id in assigned_user_ids],
+            "hasMore": has_more,
+            "notMatched": not_matched
         }), 201
 
     except Exception as e:
         db.session.rollback()
-        log.error(f"Error assigning service to user: {str(e)}", extra={
+        log.error("Error bulk-assigning service: %s", e, extra={
             "ip": request.remote_addr,
             "api_endpoint": request.path
         })
@@ -1,53 +1,262 @@
+import hashlib
 import requests
-from flask import Blueprint, request, Response
-from utils.tokenManagement import validate_service_ticket
+from flask import Blueprint, request, Response, current_app
+from utils.tokenManagement import validate_service_ticket_cached
+from utils.storageClient import storage_get, storage_post
+from utils.mediaCache import MediaCache
+from utils.ownershipIndex import OwnershipIndex
+from utils.storageProtocol import (
+    SERVICE_NAME,
+    FORWARD_REQUEST_HEADERS,
+    FORWARD_RESPONSE_HEADERS,
+    CACHED_RESPONSE_HEADERS,
+    HLS_CONTENT_TYPES,
+)
+from extensions import log, user_limiter, service_roles
+from env import EnvConfig
 
 storageProxy_bp = Blueprint("storageProxy", __name__)
 
-GO_STORAGE_BASE = "http://localhost:8080"
-SERVICE_NAME = "storage"
+# Segments and images never change once stored, so they can be served without
+# the StorageEngine. Playlists are left out: they are rewritten while transcoding.
+media_cache = MediaCache(
+    memory_bytes=EnvConfig.MEDIA_CACHE_MEMORY_BYTES,
+    disk_dir=EnvConfig.MEDIA_CACHE_DIR,
+    disk_bytes=EnvConfig.MEDIA_CACHE_DISK_BYTES,
+    max_object_bytes=EnvConfig.MEDIA_CACHE_MAX_OBJECT_BYTES
+) if EnvConfig.MEDIA_CACHE_ENABLED else None
+
+# Who may read which object, checked locally on every request
+ownership_index = OwnershipIndex(
+    get_engine=lambda: current_app.extensions["sqlalchemy"].engine,
+    maxsize=EnvConfig.OWNERSHIP_INDEX_SIZE,
+    refresh_interval=EnvConfig.OWNERSHIP_REFRESH_INTERVAL
+)
+
+
+@storageProxy_bp.errorhandler(requests.exceptions.Timeout)
+def handle_storage_timeout(e):
+    log.error("StorageEngine timed out: %s", e, extra={"api_endpoint": request.path})
+    return {"error": "Storage service timed out"}, 504
+
+
+@storageProxy_bp.errorhandler(requests.exceptions.RequestException)
+def handle_storage_unavailable(e):
+    log.error("StorageEngine request failed: %s", e, extra={"api_endpoint": request.path})
+    return {"error": "Storage service unavailable"}, 502
+
+
+def _rate_limited(ticket_data):
+    """429 response when the ticket's user has used up their quota, else None"""
+    user_id = ticket_data["user_id"]
+    role = service_roles.role_for(user_id, SERVICE_NAME)
+    retry_after = user_limiter.hit(user_id, role)
+    if not retry_after:
+        return None
+    log.warning("User rate limit exceeded", extra={
+        "user_id": user_id,
+        "role": role,
+        "api_endpoint": request.path
+    })
+    return {"error": "Rate limit exceeded"}, 429, {"Retry-After": str(retry_after)}
+
+
+def _can_read(ticket_data, object_id):
+    """Owner or share recipient of object_id, according to the ticket's user"""
+    if not EnvConfig.STORAGE_ENFORCE_OWNERSHIP:
+        return True
+    if ownership_index.is_allowed(ticket_data["user_id"], object_id):
+        return True
+    log.warning("Storage object access denied", extra={
+        "user_id": ticket_data["user_id"],
+        "object_id": object_id,
+        "api_endpoint": request.path
+    })
+    return False
+
+
+class _UploadStream:
+    """
+    File-like view of the incoming request body that requests can send as-is.
+    Reads one chunk at a time, so memory stays at chunk_size per upload and
+    the client is only read as fast as the StorageEngine accepts bytes.
+    """
+
+    def __init__(self, stream, length, chunk_size):
+        self.stream = stream
+        self.length = length
+        self.chunk_size = chunk_size
+        self.sent = 0
+        self._next_report = EnvConfig.STORAGE_UPLOAD_PROGRESS_BYTES
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size=-1):
+        chunk = self.stream.read(self.chunk_size if size is None or size < 0 else min(size, self.chunk_size))
+        self.sent += len(chunk)
+        if self.sent >= self._next_report:
+            log.info("Upload progress: %s of %s bytes", self.sent, self.length or 'unknown', extra={
+                "bytes_sent": self.sent,
+                "bytes_total": self.length,
+                "api_endpoint": request.path,
+                "sample": True
+            })
+            self._next_report += EnvConfig.STORAGE_UPLOAD_PROGRESS_BYTES
+        return chunk
 
 
 @storageProxy_bp.route("/upload", methods=["POST"])
 def proxy_upload():
     ticket = request.headers.get("X-Service-Ticket")
-    if not validate_service_ticket(ticket, SERVICE_NAME):
+    ticket_data = validate_service_ticket_cached(ticket, SERVICE_NAME)
+    if not ticket_data:
         return {"error": "Unauthorized"}, 401
+    limited = _rate_limited(ticket_data)
+    if limited:
+        return limited
 
-    resp = requests.post(
-        f"{GO_STORAGE_BASE}/api/v1/video/upload",
-        files=request.files
+    # The StorageEngine records this user as the owner of the new object
+    owner_header = {"X-User-Id": ticket_data["user_id"]}
+
+    if not EnvConfig.STORAGE_UPLOAD_STREAMING:
+        resp = storage_post(
+            "/api/v1/video/upload",
+            files=request.files,
+            headers=owner_header
+        )
+        return Response(resp.content, resp.status_code)
+
+    # Pipe the raw multipart body through untouched (request.files is never parsed)
+    upload = _UploadStream(request.stream, request.content_length, EnvConfig.STORAGE_UPLOAD_CHUNK_SIZE)
+    headers = {"Content-Type": request.content_type, **owner_header}
+    resp = storage_post(
+        "/api/v1/video/upload",
+        # Without a known length, send a generator so requests uses chunked encoding
+        data=upload if upload.length else iter(upload),
+        headers=headers
     )
 
-    return Response(resp.content, resp.status_code)
+    log.info("Upload forwarded: %s bytes", upload.sent, extra={
+        "bytes_sent": upload.sent,
+        "status": resp.status_code,
+        "api_endpoint": request.path
+    })
 
+    return Response(
+        resp.content,
+        resp.status_code,
+        content_type=resp.headers.get("Content-Type"),
+        headers={"X-Upload-Bytes": str(upload.sent)}
+    )
 
-@storageProxy_bp.route("/video/<video_id>/index.m3u8")
-def proxy_stream(video_id):
-    ticket = request.headers.get("X-Service-Ticket")
-    if not validate_service_ticket(ticket, SERVICE_NAME):
-        return {"error": "Unauthorized"}, 401
 
-    resp = requests.get(
-        f"{GO_STORAGE_BASE}/api/v1/video/{video_id}/index.m3u8",
-        stream=True
+def _cached_response(body, headers):
+    """Serve a cached object; Range and If-None-Match are answered locally"""
+    response = Response(body, headers=headers)
+    response.headers["X-Cache"] = "HIT"
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(body))
+
+
+def _fill_cache(chunks, cache_key, headers, expected_length):
+    """Relay chunks to the client and store the object once it arrived complete"""
+    buffered = []
+    size = 0
+    for chunk in chunks:
+        yield chunk
+        if buffered is not None:
+            size += len(chunk)
+            buffered = buffered if size <= media_cache.max_object_bytes else None
+            if buffered is not None:
+                buffered.append(chunk)
+
+    # Client disconnects close the generator before this point, so only full bodies are stored
+    if buffered is None or (expected_length is not None and size != expected_length):
+        return
+    body = b"".join(buffered)
+    if "ETag" not in headers:
+        headers["ETag"] = f'"{hashlib.sha1(body).hexdigest()}"'
+    media_cache.put(cache_key, body, headers)
+
+
+def _proxy_get(path, default_content_type="application/octet-stream", cache_key=None):
+    """
+    Stream a StorageEngine GET back to the client without buffering it.
+    Status (200/206/304/...), length, range and cache validators are forwarded
+    both ways, and the body is relayed still encoded so Content-Length holds.
+    With a cache_key, immutable objects are served from / stored in media_cache.
+    """
+    use_cache = cache_key is not None and media_cache is not None
+    if use_cache:
+        cached = media_cache.get(cache_key)
+        if cached:
+            return _cached_response(*cached)
+
+    headers = {h: request.headers[h] for h in FORWARD_REQUEST_HEADERS if h in request.headers}
+    resp = storage_get(path, headers=headers, stream=True)
+
+    content_type = resp.headers.get("Content-Type", default_content_type)
+    body = resp.raw.stream(EnvConfig.STORAGE_STREAM_CHUNK_SIZE, decode_content=False)
+
+    expected_length = resp.headers.get("Content-Length")
+    expected_length = int(expected_length) if expected_length and expected_length.isdigit() else None
+    if (use_cache and resp.status_code == 200
+            and "Content-Encoding" not in resp.headers
+            and (expected_length is None or expected_length <= media_cache.max_object_bytes)):
+        cached_headers = {h: resp.headers[h] for h in CACHED_RESPONSE_HEADERS if h in resp.headers}
+        cached_headers["Content-Type"] = content_type
+        body = _fill_cache(body, cache_key, cached_headers, expected_length)
+
+    response = Response(
+        body,
+        status=resp.status_code,
+        headers={h: resp.headers[h] for h in FORWARD_RESPONSE_HEADERS if h in resp.headers},
+        content_type=content_type,
+        direct_passthrough=True
     )
+    # Return the pooled connection once the client is done (or disconnects)
+    response.call_on_close(resp.close)
+    return response
 
-    return Response(
-        resp.iter_content(chunk_size=8192),
-        content_type="application/vnd.apple.mpegurl"
+
+@storageProxy_bp.route("/video/<video_id>/<filename>")
+def proxy_stream(video_id, filename):
+    """HLS playlist (index.m3u8) and its segments"""
+    ticket = request.headers.get("X-Service-Ticket")
+    ticket_data = validate_service_ticket_cached(ticket, SERVICE_NAME)
+    if not ticket_data:
+        return {"error": "Unauthorized"}, 401
+    limited = _rate_limited(ticket_data)
+    if limited:
+        return limited
+    if not _can_read(ticket_data, video_id):
+        return {"error": "Forbidden"}, 403
+
+    extension = filename[filename.rfind("."):].lower() if "." in filename else ""
+    return _proxy_get(
+        f"/api/v1/video/{video_id}/{filename}",
+        default_content_type=HLS_CONTENT_TYPES.get(extension, "application/octet-stream"),
+        cache_key=None if extension == ".m3u8" else f"video/{video_id}/{filename}"
     )
 
 
 @storageProxy_bp.route("/image/<image_id>")
 def proxy_image(image_id):
     ticket = request.headers.get("X-Service-Ticket")
-    if not validate_service_ticket(ticket, SERVICE_NAME):
+    ticket_data = validate_service_ticket_cached(ticket, SERVICE_NAME)
+    if not ticket_data:
         return {"error": "Unauthorized"}, 401
+    limited = _rate_limited(ticket_data)
+    if limited:
+        return limited
+    if not _can_read(ticket_data, image_id):
+        return {"error": "Forbidden"}, 403
 
-    resp = requests.get(
-        f"{GO_STORAGE_BASE}/api/v1/image/{image_id}",
-        stream=True
-    )
-
-    return Response(resp.content, resp.status_code)
+    return _proxy_get(f"/api/v1/image/{image_id}", cache_key=f"image/{image_id}")
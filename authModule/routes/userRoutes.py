@@ -1,13 +1,19 @@
-from flask import Blueprint, request, jsonify
+import json
+import shutil
+import tempfile
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from werkzeug.exceptions import HTTPException
 from flask import Blueprint, request, jsonify
 from extensions import db, log, limiter
-from utils.passwordHashing import hashPassword, verifyPassword
+from utils.passwordHashing import hashPassword, verifyPassword, needsRehash, bulkHashingJob, PasswordPoolBusy
 from database.UserModel import UserModel
 
-from utils.passwordHashing import hashPassword , verifyPassword
 from database.UserModel import UserModel 
+from sqlalchemy.dialects.postgresql import insert
 from utils.kerberosUtils import generate_session_key
 from utils.tokenManagement import create_tgt
+from utils.adminAuth import admin_required
+from utils.bulkImport import BulkUserImporter, ImportFormatError, detect_format, read_records
 
 
 # print(UserModel.__table__)
@@ -23,7 +29,9 @@ def users_health():
 #error handler 
 @userRoute.errorhandler(Exception)
 def handle_user_route_error(e):
-    log.error(f"Error in userRoute: {str(e)}")
+    if isinstance(e, HTTPException):
+        return e  # keep 429s from the limiter (and other HTTP errors) as they are
+    log.error("Error in userRoute: %s", e)
     return jsonify({"error": "An error occurred in userRoute"}), 500
 
 #register user endpoint
@@ -42,9 +50,9 @@ def register_user():
         # print(f"Received registration data for user: {username}, email: {email}, dateOfBirth: {dateOfBirth} , password: {password} , password_confirm: {password_confirm} ")
 
         # Basic validation
-        if not username or not password or not password_confirm:
-            log.warning("Missing username or password in registration", extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
-            return jsonify({"error": "Username and password are required"}), 400
+        if not username or not email or not password or not password_confirm:
+            log.warning("Missing username, email or password in registration", extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
+            return jsonify({"error": "Username, email and password are required"}), 400
        
         # Here you would typically add code to save the user to a database
         if password != password_confirm:
@@ -52,29 +60,104 @@ def register_user():
 
             return jsonify({"error": "Passwords do not match"}), 400
         
-        #check if the user already exists
-        existing_user = UserModel.query.filter_by(email=email).first()
-        if existing_user:
+        # Cheap indexed check first, so duplicates never pay for an Argon2 hash
+        if db.session.query(UserModel.id).filter_by(email=email).first() is not None:
             log.warning("User with this email already exists",  extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
-            return jsonify({"error": "User with this email already exists"}), 400
-        
+            return jsonify({"error": "User with this email already exists"}), 409
+
        #hash the password before storing 
         hashed_password = hashPassword(password)
-        # For this example, we'll just return a success message
-        addNewuser = UserModel(name=username,email=email,passwordHash=hashed_password,dataOfBirth=dateOfBirth)
-        db.session.add(addNewuser) 
-        db.session.commit() 
+
+        # The unique email index stays the guard against concurrent registrations
+        new_user_id = db.session.execute(
+            insert(UserModel)
+            .values(name=username, email=email, passwordHash=hashed_password, dataOfBirth=dateOfBirth)
+            .on_conflict_do_nothing(index_elements=[UserModel.email])
+            .returning(UserModel.id)
+        ).scalar()
+        db.session.commit()
+
+        if new_user_id is None:
+            log.warning("User with this email already exists",  extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
+            return jsonify({"error": "User with this email already exists"}), 409
         #log the registration event    
-        log.info(f"User {username} registered successfully",  extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
+        log.info("User %s registered successfully", username,  extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
         return jsonify({"message": f"User {username} registered successfully"}), 201
 
-
+    except PasswordPoolBusy:
+        db.session.rollback()
+        log.warning("Password hashing pool saturated during registration", extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
+        return jsonify({"error": "Server is busy, please retry shortly"}), 503, {"Retry-After": "1"}
     except Exception as e:
         db.session.rollback()
-        log.error(f"Error registering user: {str(e)}", extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
+        log.error("Error registering user: %s", e, extra={"username": username,"ip": request.remote_addr,"api_endpoint": request.path})
         return jsonify({"error": "An error occurred during registration"}), 500
 
 
+#bulk import endpoint (admin)
+@userRoute.route('/import', methods=['POST'])
+@limiter.exempt  # admin-only, and one call carries thousands of users
+@admin_required
+def import_users():
+    """
+    Body: CSV (header row) or JSONL, raw or as multipart field "file".
+    Query: format=csv|jsonl (else from Content-Type / filename), skip=<rows already processed>.
+    Streams NDJSON events: per-row failures, one progress line per committed
+    batch and a final summary; resume with skip=<last processed>.
+    """
+    upload = request.files.get("file")
+    try:
+        fmt = detect_format(
+            filename=upload.filename if upload else None,
+            content_type=None if upload else request.content_type,
+            explicit=request.args.get("format")
+        )
+        skip = int(request.args.get("skip", 0))
+    except (ImportFormatError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Admission before the response starts, so a busy server answers 503 up front
+    try:
+        job = bulkHashingJob()
+    except PasswordPoolBusy:
+        log.warning("Bulk user import rejected: another bulk job is running", extra={"ip": request.remote_addr, "api_endpoint": request.path})
+        return jsonify({"error": "Another bulk job is running, please retry later"}), 503, {"Retry-After": "60"}
+
+    # Spool the body first so the client is not held open while rows are hashed
+    source = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    try:
+        shutil.copyfileobj(upload.stream if upload else request.stream, source)
+        source.seek(0)
+    except Exception:
+        job.release()
+        source.close()
+        raise
+
+    log.info("Bulk user import started", extra={"format": fmt, "skip": skip, "ip": request.remote_addr, "api_endpoint": request.path})
+
+    def events():
+        last = {"processed": skip}
+        try:
+            for event in BulkUserImporter(db.session, job).run(read_records(source, fmt), skip=skip):
+                if "error" not in event:
+                    last = event
+                yield json.dumps(event) + "\n"
+            log.info("Bulk user import finished: %s inserted, %s failed", last["inserted"], last["failed"], extra=last)
+        except Exception as e:
+            db.session.rollback()
+            log.error("Bulk user import stopped after row %s: %s", last["processed"], e, extra={"processed": last["processed"]})
+            yield json.dumps({"error": "Import stopped", "resumeSkip": last["processed"]}) + "\n"
+        finally:
+            job.release()
+            source.close()
+
+    response = Response(stream_with_context(events()), mimetype="application/x-ndjson")
+    # The generator's finally never runs if the client is gone before the first chunk
+    response.call_on_close(job.release)
+    response.call_on_close(source.close)
+    return response
+
+
 
 
 
@@ -112,6 +195,27 @@ def login_user():
             )
             return jsonify({"error": "Invalid email or password"}), 401
 
+        # Upgrade the stored hash if Argon2 parameters changed since it was made
+        if needsRehash(user.passwordHash):
+            try:
+                new_hash = hashPassword(password)
+                if new_hash:
+                    user.passwordHash = new_hash
+                    db.session.commit()
+                    log.info(
+                        "Password hash upgraded to current Argon2 parameters",
+                        extra={"email": email, "ip": request.remote_addr, "api_endpoint": request.path}
+                    )
+            except PasswordPoolBusy:
+                # Login already succeeded; try again on a later login
+                pass
+            except Exception as e:
+                db.session.rollback()
+                log.warning(
+                    "Password rehash failed: %s", e,
+                    extra={"email": email, "ip": request.remote_addr, "api_endpoint": request.path}
+                )
+
         # 🔐 Kerberos-style AS logic
         session_key = generate_session_key()
         tgt = create_tgt(str(user.id), session_key)
@@ -126,9 +230,15 @@ def login_user():
             "tgt": tgt
         }), 200
 
+    except PasswordPoolBusy:
+        log.warning(
+            "Password hashing pool saturated during login",
+            extra={"email": email, "ip": request.remote_addr, "api_endpoint": request.path}
+        )
+        return jsonify({"error": "Server is busy, please retry shortly"}), 503, {"Retry-After": "1"}
     except Exception as e:
         log.error(
-            f"Error during user login: {str(e)}",
+            "Error during user login: %s", e,
             extra={"email": email, "ip": request.remote_addr, "api_endpoint": request.path}
         )
         return jsonify({"error": "An error occurred during login"}), 500
@@ -0,0 +1,46 @@
+import os
+import sys
+import pytest
+
+AUTH_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules import each other from the authModule root (e.g. "from env import EnvConfig")
+sys.path.insert(0, AUTH_MODULE_DIR)
+
+# Read once when env.py is imported: keep the storage proxy from creating cache/media
+os.environ.setdefault("MEDIA_CACHE_ENABLED", "false")
+
+ADMIN_TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App on a throwaway SQLite database, with rate limits off and admin endpoints enabled"""
+    from app import create_app
+    from env import EnvConfig
+    from extensions import db
+
+    class TestConfig(EnvConfig):
+        TESTING = True
+        RATELIMIT_ENABLED = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'auth.sqlite'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    monkeypatch.setattr(EnvConfig, "ADMIN_API_TOKEN", ADMIN_TOKEN)
+    monkeypatch.chdir(AUTH_MODULE_DIR)  # static/, keys/ and logs/ are relative paths
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers():
+    return {"X-Admin-Token": ADMIN_TOKEN}
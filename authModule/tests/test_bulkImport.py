@@ -0,0 +1,61 @@
+import io
+import pytest
+from utils.bulkImport import ImportFormatError, detect_format, read_records, _validate
+
+
+@pytest.mark.parametrize("kwargs, expected", [
+    ({"explicit": "jsonl", "filename": "users.csv"}, "jsonl"),
+    ({"content_type": "text/csv"}, "csv"),
+    ({"content_type": "application/x-ndjson"}, "jsonl"),
+    ({"filename": "Users.CSV"}, "csv"),
+    ({"filename": "users.ndjson"}, "jsonl"),
+])
+def test_detect_format(kwargs, expected):
+    assert detect_format(**kwargs) == expected
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"explicit": "xml"},
+    {"filename": "users.txt"},
+    {},
+])
+def test_detect_format_rejects_unknown(kwargs):
+    with pytest.raises(ImportFormatError):
+        detect_format(**kwargs)
+
+
+def test_read_csv_records():
+    source = io.BytesIO("\ufeffusername,email,password\nann,ann@example.com,pw\nbob,bob@example.com,pw\n".encode())
+    records = list(read_records(source, "csv"))
+
+    assert [row for row, _ in records] == [1, 2]
+    assert records[0][1] == {"username": "ann", "email": "ann@example.com", "password": "pw"}
+
+
+def test_read_jsonl_records_skips_blank_lines_and_marks_bad_ones():
+    source = io.BytesIO(b'{"username": "ann"}\n\nnot json\n[1, 2]\n{"username": "bob"}\n')
+    records = list(read_records(source, "jsonl"))
+
+    assert records == [(1, {"username": "ann"}), (2, None), (3, None), (4, {"username": "bob"})]
+
+
+def test_validate_accepts_name_alias_and_optional_birth_date():
+    (values, password), error = _validate({"name": " ann ", "email": "ann@example.com", "password": "pw"})
+
+    assert error is None
+    assert values == {"name": "ann", "email": "ann@example.com", "dataOfBirth": None}
+    assert password == "pw"
+
+
+@pytest.mark.parametrize("record, error", [
+    (None, "Row is not valid JSON object / CSV"),
+    ({"email": "a@example.com", "password": "pw"}, "username, email and password are required"),
+    ({"username": "a" * 51, "email": "a@example.com", "password": "pw"}, "username is longer than 50 characters"),
+    ({"username": "a", "email": "a" * 201, "password": "pw"}, "email is longer than 200 characters"),
+    ({"username": "a", "email": "a@example.com", "password": 123}, "password must be a string"),
+    ({"username": "a", "email": "a@example.com", "password": "pw", "dateOfBirth": 19900101}, "dateOfBirth must be a string"),
+    ({"username": "a", "email": "a@example.com", "password": "pw", "dateOfBirth": "1" * 201},
+     "dateOfBirth is longer than 200 characters"),
+])
+def test_validate_rejects(record, error):
+    assert _validate(record) == (None, error)
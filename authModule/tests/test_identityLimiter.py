@@ -0,0 +1,86 @@
+import time
+import pytest
+from limits.storage import MemoryStorage
+from utils.identityLimiter import IdentityRateLimiter, parse_role_limits
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def _limiter(storage=None, spec="Admin=10/minute;default=3/minute"):
+    limiter = IdentityRateLimiter(
+        "test",
+        parse_role_limits(spec),
+        get_storage=lambda: storage,
+        key_prefix="tests"
+    )
+    limiter._ensure_thread = lambda: None  # tests call sync() themselves
+    return limiter
+
+
+def test_parse_role_limits():
+    limits = parse_role_limits("Admin=10/minute; ;default=3/second")
+
+    assert limits["Admin"].amount == 10
+    assert limits["default"].get_expiry() == 1
+    with pytest.raises(ValueError):
+        parse_role_limits("Admin=10/minute")
+
+
+def test_bucket_allows_capacity_then_reports_retry_after(clock):
+    limiter = _limiter()
+
+    assert [limiter.hit("user-1") for _ in range(3)] == [0, 0, 0]
+    assert limiter.hit("user-1") == 20  # one token refills every 60 / 3 seconds
+    assert limiter.hit("user-2") == 0
+    assert limiter.stats()["limited"] == 1
+
+
+def test_bucket_refills_over_time(clock):
+    limiter = _limiter()
+    for _ in range(3):
+        limiter.hit("user-1")
+
+    clock[0] += 20
+    assert limiter.hit("user-1") == 0
+    assert limiter.hit("user-1") > 0
+
+
+def test_role_picks_quota_and_unknown_roles_use_default(clock):
+    limiter = _limiter()
+
+    assert all(limiter.hit("admin", "Admin") == 0 for _ in range(10))
+    assert limiter.hit("admin", "Admin") > 0
+    assert all(limiter.hit("dev", "Developer") == 0 for _ in range(3))
+    assert limiter.hit("dev", "Developer") > 0
+
+
+def test_sync_shares_consumption_between_workers(clock):
+    storage = MemoryStorage()
+    first, second = _limiter(storage), _limiter(storage)
+
+    first.hit("user-1")
+    first.hit("user-1")
+    first.sync()
+    second.hit("user-1")
+    second.sync()
+
+    # The second worker has drained what the first one used
+    assert second.hit("user-1") > 0
+
+
+def test_sync_keeps_pending_hits_when_storage_fails(clock):
+    class BrokenStorage:
+        def incr(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+    limiter = _limiter(BrokenStorage())
+    limiter.hit("user-1")
+    limiter.sync()
+
+    assert limiter.stats()["sync_failures"] == 1
+    assert limiter._buckets[("user-1", "default")].pending == 1
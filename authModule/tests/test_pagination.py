@@ -0,0 +1,46 @@
+import base64
+import json
+import uuid
+import pytest
+from env import EnvConfig
+from utils.pagination import InvalidCursor, page_size, encode_cursor, decode_cursor
+
+
+def _raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_page_size_defaults_and_clamps(monkeypatch):
+    monkeypatch.setattr(EnvConfig, "PAGE_SIZE_DEFAULT", 50)
+    monkeypatch.setattr(EnvConfig, "PAGE_SIZE_MAX", 200)
+
+    assert page_size(None) == 50
+    assert page_size("") == 50
+    assert page_size("10") == 10
+    assert page_size("0") == 1
+    assert page_size("1000") == 200
+    with pytest.raises(InvalidCursor):
+        page_size("ten")
+
+
+def test_cursor_round_trip():
+    key_id = uuid.uuid4()
+    cursor = encode_cursor("2026-10-18T12:00:00+00:00", key_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == ["2026-10-18T12:00:00+00:00", str(key_id)]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    _raw_cursor({"a": 1}),
+    _raw_cursor(["only one"]),
+    _raw_cursor(["a", "b", "c"]),
+    _raw_cursor([1, 2]),
+    _raw_cursor([None, "x"]),
+    _raw_cursor([["nested"], {}]),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
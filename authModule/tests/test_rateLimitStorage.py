@@ -0,0 +1,48 @@
+import pytest
+from limits.storage import storage_from_string
+from utils.rateLimitStorage import DenyCacheStorage, check_strategy
+
+
+def test_check_strategy():
+    check_strategy("moving-window")
+    check_strategy("fixed-window")
+    with pytest.raises(ValueError):
+        check_strategy("sliding-window-counter")
+
+
+@pytest.fixture
+def storage():
+    storage = storage_from_string("denycache+memory://")
+    yield storage
+    storage.reset()
+
+
+def test_scheme_wraps_the_shared_backend(storage):
+    assert isinstance(storage, DenyCacheStorage)
+    assert storage.check()
+
+
+def test_full_window_is_denied_locally(storage):
+    assert storage.acquire_entry("k", 2, 60)
+    assert storage.acquire_entry("k", 2, 60)
+    assert not storage.acquire_entry("k", 2, 60)
+
+    def shared_call(*args, **kwargs):
+        raise AssertionError("denied key reached the shared storage")
+
+    storage.shared.acquire_entry = shared_call
+    assert not storage.acquire_entry("k", 2, 60)
+
+
+def test_clear_forgets_the_denial(storage):
+    for _ in range(3):
+        storage.acquire_entry("k", 2, 60)
+
+    storage.clear("k")
+    assert storage.acquire_entry("k", 2, 60)
+
+
+def test_counters_pass_through(storage):
+    assert storage.incr("counter", 60) == 1
+    assert storage.incr("counter", 60, amount=4) == 5
+    assert storage.get("counter") == 5
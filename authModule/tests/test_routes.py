@@ -0,0 +1,72 @@
+import base64
+import json
+import uuid
+import pytest
+from env import EnvConfig
+from extensions import db
+from database.organization import OrganizationModel
+from database.services import ServicesModel
+
+
+def test_service_list_walks_pages_with_cursor(client):
+    organization = OrganizationModel(name="acme")
+    db.session.add(organization)
+    db.session.commit()
+    names = ["alpha", "bravo", "charlie", "delta", "echo"]
+    db.session.add_all(ServicesModel(name=name, organizationId=organization.id) for name in reversed(names))
+    db.session.commit()
+
+    seen, cursor = [], None
+    for _ in range(len(names)):
+        query = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/services/list", query_string=query).get_json()
+        seen += [service["name"] for service in body["services"]]
+        cursor = body["nextCursor"]
+        if not cursor:
+            break
+
+    assert seen == names
+
+
+@pytest.mark.parametrize("cursor", [
+    "garbage",
+    base64.urlsafe_b64encode(json.dumps([1, 2]).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps(["alpha", "not-a-uuid"]).encode()).decode(),
+])
+def test_list_endpoints_reject_bad_cursors(client, cursor):
+    assert client.get("/api/services/list", query_string={"cursor": cursor}).status_code == 400
+    response = client.get("/api/apikeys/list", query_string={"userId": str(uuid.uuid4()), "cursor": cursor})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("url, payload", [
+    ("/api/services/assign/bulk", {"serviceId": "nope", "userIds": [str(uuid.uuid4())]}),
+    ("/api/services/assign/bulk", {"serviceId": str(uuid.uuid4()), "role": "Boss", "userIds": [str(uuid.uuid4())]}),
+    ("/api/services/assign/bulk", {"serviceId": str(uuid.uuid4())}),
+    ("/api/services/assign/bulk", {"serviceId": str(uuid.uuid4()), "userIds": "not-a-list"}),
+    ("/api/services/assign/bulk", {"serviceId": str(uuid.uuid4()), "userIds": ["nope"]}),
+    ("/api/services/assign/bulk", {"serviceId": str(uuid.uuid4()), "emails": ["a@example.com"] * 3}),
+    ("/api/apikeys/generate/bulk", {"serviceId": "nope", "allAssigned": True}),
+    ("/api/apikeys/generate/bulk", {"serviceId": str(uuid.uuid4())}),
+    ("/api/apikeys/generate/bulk", {"serviceId": str(uuid.uuid4()), "userIds": [str(uuid.uuid4())] * 3}),
+])
+def test_bulk_endpoints_reject_invalid_input(client, admin_headers, monkeypatch, url, payload):
+    monkeypatch.setattr(EnvConfig, "BULK_ASSIGN_MAX", 2)
+    monkeypatch.setattr(EnvConfig, "BULK_API_KEY_MAX", 2)
+
+    response = client.post(url, json=payload, headers=admin_headers)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("query", [{"format": "xml"}, {"format": "csv", "skip": "ten"}, {}])
+def test_bulk_import_rejects_invalid_input(client, admin_headers, query):
+    response = client.post("/api/users/import", query_string=query, data=b"",
+                           content_type="text/plain", headers=admin_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("url", ["/api/services/assign/bulk", "/api/apikeys/generate/bulk", "/api/users/import"])
+def test_bulk_endpoints_require_admin_token(client, url):
+    assert client.post(url, json={}).status_code == 401
+    assert client.post(url, json={}, headers={"X-Admin-Token": "wrong"}).status_code == 401
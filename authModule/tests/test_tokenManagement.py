@@ -0,0 +1,110 @@
+import base64
+import time
+import uuid
+import pytest
+from env import EnvConfig
+from utils import tokenManagement
+from utils.kerberosUtils import generate_session_key
+from utils.tokenManagement import (
+    TICKET_VERSION_COMPACT,
+    create_tgt,
+    create_service_ticket,
+    validate_tgt,
+    validate_service_ticket,
+    validate_service_ticket_cached,
+)
+
+
+def _first_byte(ticket):
+    return base64.urlsafe_b64decode(ticket + "=" * (-len(ticket) % 4))[0]
+
+
+@pytest.fixture
+def user_id():
+    return str(uuid.uuid4())
+
+
+@pytest.fixture
+def session_key():
+    return generate_session_key()
+
+
+def test_compact_service_ticket_round_trip(monkeypatch, user_id, session_key):
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "compact")
+    ticket = create_service_ticket(user_id, "storage", session_key)
+
+    assert _first_byte(ticket) == TICKET_VERSION_COMPACT
+    data = validate_service_ticket(ticket, "storage")
+    assert data["user_id"] == user_id
+    assert data["session_key"] == session_key
+    assert data["service"] == "storage"
+    assert validate_service_ticket(ticket, "other") is None
+    assert validate_tgt(ticket) is None
+
+
+def test_compact_tgt_round_trip(monkeypatch, user_id, session_key):
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "compact")
+    tgt = create_tgt(user_id, session_key)
+
+    data = validate_tgt(tgt)
+    assert data["type"] == "TGT"
+    assert data["user_id"] == user_id
+    assert validate_service_ticket(tgt, "storage") is None
+
+
+def test_tampered_compact_ticket_is_rejected(monkeypatch, user_id, session_key):
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "compact")
+    raw = bytearray(base64.urlsafe_b64decode(create_service_ticket(user_id, "storage", session_key) + "=="))
+    raw[-1] ^= 1
+    tampered = base64.urlsafe_b64encode(bytes(raw)).rstrip(b"=").decode()
+
+    assert validate_service_ticket(tampered, "storage") is None
+
+
+def test_expired_ticket_is_rejected(monkeypatch, user_id, session_key):
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "compact")
+    ticket = create_service_ticket(user_id, "storage", session_key, expires_in=-1)
+
+    assert validate_service_ticket(ticket, "storage") is None
+
+
+def test_fernet_tickets_still_validate(monkeypatch, user_id, session_key):
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "fernet")
+    ticket = create_service_ticket(user_id, "storage", session_key)
+
+    assert _first_byte(ticket) == 0x80
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "compact")
+    data = validate_service_ticket(ticket, "storage")
+    assert data["user_id"] == user_id
+    assert data["service"] == "storage"
+
+
+def test_payload_outside_compact_layout_falls_back_to_fernet(monkeypatch, session_key):
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "compact")
+    ticket = create_service_ticket("not-a-uuid", "storage", session_key)
+
+    assert _first_byte(ticket) == 0x80
+    assert validate_service_ticket(ticket, "storage")["user_id"] == "not-a-uuid"
+
+
+def test_cached_validation_reuses_decoded_ticket(monkeypatch, user_id, session_key):
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "compact")
+    ticket = create_service_ticket(user_id, "storage", session_key)
+    assert validate_service_ticket_cached(ticket, "storage")["user_id"] == user_id
+
+    def fail(*args):
+        raise AssertionError("ticket decrypted again")
+
+    monkeypatch.setattr(tokenManagement, "validate_service_ticket", fail)
+    assert validate_service_ticket_cached(ticket, "storage")["user_id"] == user_id
+    assert validate_service_ticket_cached("", "storage") is None
+
+
+def test_cached_validation_stops_at_ticket_expiry(monkeypatch, user_id, session_key):
+    monkeypatch.setattr(EnvConfig, "TICKET_FORMAT", "compact")
+    ticket = create_service_ticket(user_id, "storage", session_key, expires_in=5)
+    assert validate_service_ticket_cached(ticket, "storage")
+
+    later = time.time() + 10
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert validate_service_ticket_cached(ticket, "storage") is None
@@ -0,0 +1,65 @@
+import time
+from utils.ttlCache import TTLCache
+
+
+def test_get_returns_value_until_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    now[0] += 59
+    assert cache.get("a") == 1
+    now[0] += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_expires_at_shortens_deadline(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", 1, expires_at=1010)
+    cache.set("long", 2, expires_at=5000)  # capped at ttl
+
+    now[0] = 1010
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    now[0] = 1060
+    assert cache.get("long") is None
+
+
+def test_full_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_pop_and_clear():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_evict_expired_keeps_live_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("old", 1, expires_at=1005)
+    cache.set("live", 2)
+
+    now[0] = 1006
+    assert cache.evict_expired() == 1
+    assert len(cache) == 1
+    assert cache.get("live") == 2
@@ -0,0 +1,20 @@
+import hmac
+from functools import wraps
+from flask import request, jsonify
+from env import EnvConfig
+from extensions import log
+
+
+def admin_required(view):
+    """Allow the request only with X-Admin-Token matching ADMIN_API_TOKEN"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = EnvConfig.ADMIN_API_TOKEN
+        if not expected:
+            return jsonify({"error": "Admin endpoints are disabled"}), 403
+        provided = request.headers.get("X-Admin-Token", "")
+        if not hmac.compare_digest(provided.encode(), expected.encode()):
+            log.warning("Rejected admin request", extra={"ip": request.remote_addr, "api_endpoint": request.path})
+            return jsonify({"error": "Unauthorized"}), 401
+        return view(*args, **kwargs)
+    return wrapper
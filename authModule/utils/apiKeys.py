@@ -0,0 +1,16 @@
+import hmac
+import hashlib
+from env import EnvConfig
+
+_FINGERPRINT_SECRET = EnvConfig.API_KEY_FINGERPRINT_SECRET.encode()
+
+
+def fingerprint_api_key(raw_api_key):
+    """
+    Keyed HMAC-SHA256 of a raw API key.
+    Stored in an indexed column so validation is one lookup instead of
+    an Argon2 verify against every stored key.
+    """
+    return hmac.new(
+        _FINGERPRINT_SECRET, raw_api_key.encode(), hashlib.sha256
+    ).hexdigest()
@@ -0,0 +1,130 @@
+import atexit
+import datetime
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from sqlalchemy import insert
+
+log = logging.getLogger("authModule")
+
+
+class AuditWriter:
+    """
+    Buffers AuditLog events in memory and writes them in bulk from a
+    background thread, so request handlers never wait on the audit table.
+
+    record() only appends to a bounded ring buffer. The writer flushes when
+    `batch_size` events are pending or every `flush_interval` seconds, using
+    one multi-row INSERT per batch. When the buffer is full the oldest event
+    is overwritten and counted in `dropped`. Pending events are flushed on
+    interpreter exit.
+    """
+
+    def __init__(self, capacity=10000, batch_size=500, flush_interval=2.0):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.app = None
+
+        self._buffer = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._pid = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["audit_writer"] = self
+        atexit.register(self.shutdown)
+
+    def record(self, api_key_id, event, ip_address=None):
+        row = {
+            "id": uuid.uuid4(),
+            "api_key_id": uuid.UUID(str(api_key_id)),
+            "event": event,
+            "ip_address": ip_address,
+            "timestamp": datetime.datetime.utcnow()
+        }
+        with self._lock:
+            if len(self._buffer) == self.capacity:
+                self.dropped += 1
+            self._buffer.append(row)
+            self.enqueued += 1
+            pending = len(self._buffer)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def stats(self):
+        return {
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": len(self._buffer)
+        }
+
+    def flush(self):
+        """Write everything pending; returns the number of rows written"""
+        total = 0
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if not batch:
+                return total
+            total += self._write(batch)
+
+    def shutdown(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=10)
+        self.flush()
+
+    def _ensure_thread(self):
+        # Threads do not survive a fork (gunicorn preload), so start one per process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                log.error("Audit writer flush failed: %s", e)
+
+    def _write(self, batch):
+        from database.auditLog import AuditLog
+
+        if self.app is None:
+            self.failed += len(batch)
+            return 0
+
+        db = self.app.extensions["sqlalchemy"]
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(AuditLog), batch)
+                db.session.commit()
+                self.written += len(batch)
+                return len(batch)
+            except Exception as e:
+                db.session.rollback()
+                self.failed += len(batch)
+                log.error("Failed to write %s audit events: %s", len(batch), e)
+                return 0
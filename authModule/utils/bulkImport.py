@@ -0,0 +1,256 @@
+"""
+Bulk user import from CSV or JSONL.
+
+Records are read as a stream and handled in batches. For each batch:
+- one SELECT finds emails that are already registered, so they are not hashed;
+- passwords are hashed on the shared bulk-hashing pool (utils.passwordHashing);
+- rows are written with one multi-row INSERT ... ON CONFLICT (email) DO NOTHING;
+- the batch is committed.
+
+Progress is reported as events. Every batch event carries `processed`, the
+number of input records now settled. Pass it back as `skip` to resume an
+interrupted import where it stopped.
+
+Columns / keys: username (or name), email, password, dateOfBirth (optional).
+
+Usage (from authModule/):
+    python -m utils.bulkImport users.csv
+    python -m utils.bulkImport users.jsonl --failures failed.jsonl
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+from sqlalchemy.dialects.postgresql import insert
+from env import EnvConfig
+from utils.passwordHashing import bulkHashingJob
+
+FORMATS = ("csv", "jsonl")
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename=None, content_type=None, explicit=None):
+    """csv or jsonl from an explicit choice, a content type or a file extension"""
+    if explicit:
+        if explicit not in FORMATS:
+            raise ImportFormatError(f"format must be one of {', '.join(FORMATS)}")
+        return explicit
+    if content_type:
+        if "csv" in content_type:
+            return "csv"
+        if "ndjson" in content_type or "jsonl" in content_type:
+            return "jsonl"
+    if filename:
+        extension = os.path.splitext(filename)[1].lower()
+        if extension == ".csv":
+            return "csv"
+        if extension in (".jsonl", ".ndjson"):
+            return "jsonl"
+    raise ImportFormatError("Cannot tell the input format; use csv or jsonl")
+
+
+def read_records(binary_stream, fmt):
+    """Yield (row_number, record) one at a time; record is None for unparseable lines"""
+    text = io.TextIOWrapper(binary_stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            yield row_number, row
+        return
+
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield row_number, record if isinstance(record, dict) else None
+
+
+def _validate(record):
+    """(values for user_table, password) or (None, error message)"""
+    if record is None:
+        return None, "Row is not valid JSON object / CSV"
+    username = str(record.get("username") or record.get("name") or "").strip()
+    email = str(record.get("email") or "").strip()
+    password = record.get("password") or ""
+    if not username or not email or not password:
+        return None, "username, email and password are required"
+    if len(username) > 50:
+        return None, "username is longer than 50 characters"
+    if len(email) > 200:
+        return None, "email is longer than 200 characters"
+    if not isinstance(password, str):
+        return None, "password must be a string"
+    date_of_birth = record.get("dateOfBirth") or None
+    if date_of_birth is not None and not isinstance(date_of_birth, str):
+        return None, "dateOfBirth must be a string"
+    if date_of_birth and len(date_of_birth) > 200:
+        return None, "dateOfBirth is longer than 200 characters"
+    values = {
+        "name": username,
+        "email": email,
+        "dataOfBirth": date_of_birth
+    }
+    return (values, password), None
+
+
+class BulkUserImporter:
+    """
+    Imports users into user_table through session. Passwords are hashed by
+    `job`, a BulkHashingJob from bulkHashingJob(); the caller releases it.
+    """
+
+    def __init__(self, session, job, batch_size=None):
+        self.session = session
+        self.job = job
+        self.batch_size = batch_size or EnvConfig.BULK_IMPORT_BATCH_SIZE
+
+    def run(self, records, skip=0):
+        """
+        Yield events while importing:
+        {"row": n, "email": ..., "error": ...} for each rejected record,
+        {"processed": n, "inserted": k, "failed": f} after each committed batch,
+        {"done": true, "processed": n, "inserted": k, "failed": f} at the end.
+        """
+        from database.UserModel import UserModel
+
+        totals = {"processed": skip, "inserted": 0, "failed": 0}
+        batch = []
+        for row_number, record in records:
+            if row_number <= skip:
+                continue
+            batch.append((row_number, record))
+            if len(batch) >= self.batch_size:
+                yield from self._import_batch(UserModel, batch, totals)
+                batch = []
+        if batch:
+            yield from self._import_batch(UserModel, batch, totals)
+
+        yield {"done": True, **totals}
+
+    def _import_batch(self, UserModel, batch, totals):
+        failures = []
+        candidates = []
+        seen = set()
+        for row_number, record in batch:
+            parsed, error = _validate(record)
+            if error:
+                failures.append({"row": row_number, "error": error})
+                continue
+            values, password = parsed
+            if values["email"] in seen:
+                failures.append({"row": row_number, "email": values["email"], "error": "Duplicate email in input"})
+                continue
+            seen.add(values["email"])
+            candidates.append((row_number, values, password))
+
+        # Skip the Argon2 cost for users who are already registered (e.g. a re-run)
+        existing = set()
+        if candidates:
+            existing = set(self.session.execute(
+                UserModel.__table__.select()
+                .with_only_columns(UserModel.email)
+                .where(UserModel.email.in_([values["email"] for _, values, _ in candidates]))
+            ).scalars())
+        for row_number, values, _ in candidates:
+            if values["email"] in existing:
+                failures.append({"row": row_number, "email": values["email"], "error": "User with this email already exists"})
+        candidates = [candidate for candidate in candidates if candidate[1]["email"] not in existing]
+
+        inserted = 0
+        if candidates:
+            hashes = self.job.hash([password for _, _, password in candidates])
+
+            rows = [{**values, "passwordHash": hashed} for (_, values, _), hashed in zip(candidates, hashes)]
+            try:
+                created = set(self.session.execute(
+                    insert(UserModel)
+                    .values(rows)
+                    .on_conflict_do_nothing(index_elements=[UserModel.email])
+                    .returning(UserModel.email)
+                ).scalars())
+                self.session.commit()
+            except Exception:
+                self.session.rollback()
+                raise
+            inserted = len(created)
+            # Registered by someone else between the SELECT above and the INSERT
+            for row_number, values, _ in candidates:
+                if values["email"] not in created:
+                    failures.append({"row": row_number, "email": values["email"], "error": "User with this email already exists"})
+
+        failures.sort(key=lambda failure: failure["row"])
+        yield from failures
+
+        totals["processed"] = batch[-1][0]
+        totals["inserted"] += inserted
+        totals["failed"] += len(failures)
+        yield dict(totals)
+
+
+def _load_checkpoint(path):
+    try:
+        with open(path) as handle:
+            return int(json.load(handle)["processed"])
+    except FileNotFoundError:
+        return 0
+
+
+def _save_checkpoint(path, event):
+    # Written atomically so a crash mid-write never corrupts the resume point
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(event, handle)
+    os.replace(temporary, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import users from a CSV or JSONL file")
+    parser.add_argument("source", help="CSV (header row) or JSONL file")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=EnvConfig.BULK_IMPORT_BATCH_SIZE,
+                        help=f"rows per INSERT / commit (default {EnvConfig.BULK_IMPORT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=EnvConfig.BULK_HASH_WORKERS,
+                        help=f"hashing threads (default {EnvConfig.BULK_HASH_WORKERS})")
+    parser.add_argument("--checkpoint", help="resume file (default: <source>.checkpoint)")
+    parser.add_argument("--failures", help="append rejected rows to this JSONL file (default: <source>.failures.jsonl)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    fmt = detect_format(filename=args.source, explicit=args.format)
+    checkpoint = args.checkpoint or f"{args.source}.checkpoint"
+    failures_path = args.failures or f"{args.source}.failures.jsonl"
+    skip = 0 if args.restart else _load_checkpoint(checkpoint)
+    if skip:
+        print(f"Resuming after row {skip} (from {checkpoint})")
+
+    from app import create_app
+    from extensions import db
+
+    EnvConfig.BULK_HASH_WORKERS = args.workers  # read when the bulk pool is first created
+    app = create_app()
+    with app.app_context(), bulkHashingJob() as job, open(args.source, "rb") as source, \
+            open(failures_path, "a") as failures:
+        importer = BulkUserImporter(db.session, job, batch_size=args.batch_size)
+        for event in importer.run(read_records(source, fmt), skip=skip):
+            if "error" in event:
+                failures.write(json.dumps(event) + "\n")
+            elif event.get("done"):
+                print(f"Done: {event['processed']} rows, {event['inserted']} inserted, "
+                      f"{event['failed']} failed (see {failures_path})")
+            else:
+                failures.flush()
+                _save_checkpoint(checkpoint, event)
+                print(f"  {event['processed']} rows, {event['inserted']} inserted, {event['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark Argon2 on this host and suggest parameters.
+Memory is fixed at the largest value the budget allows (memory hardness is
+what makes GPU cracking expensive), then time_cost is raised until a verify
+reaches the target latency. If even time_cost=1 is too slow, memory is
+halved until it fits.
+
+Usage (from authModule/):
+    python -m utils.calibrateArgon2 --target-ms 250 --max-memory-mb 64
+"""
+
+import argparse
+import os
+import statistics
+import time
+from argon2 import PasswordHasher
+
+MIN_MEMORY_KIB = 8 * 1024
+MAX_TIME_COST = 20
+
+
+def measure_verify_ms(time_cost, memory_cost, parallelism, rounds=5):
+    """Median wall-clock milliseconds for one verify with the given parameters"""
+    ph = PasswordHasher(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        hash_len=32,
+        salt_len=16
+    )
+    stored_hash = ph.hash("calibration-password")
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        ph.verify(stored_hash, "calibration-password")
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(target_ms, max_memory_kib, parallelism, rounds=5):
+    memory_cost = max_memory_kib
+    while True:
+        elapsed = measure_verify_ms(1, memory_cost, parallelism, rounds)
+        print(f"  m={memory_cost // 1024} MB t=1 -> {elapsed:.1f} ms")
+        if elapsed <= target_ms or memory_cost // 2 < MIN_MEMORY_KIB:
+            break
+        memory_cost //= 2
+
+    time_cost = 1
+    while time_cost < MAX_TIME_COST:
+        elapsed = measure_verify_ms(time_cost + 1, memory_cost, parallelism, rounds)
+        print(f"  m={memory_cost // 1024} MB t={time_cost + 1} -> {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        time_cost += 1
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "verify_ms": measure_verify_ms(time_cost, memory_cost, parallelism, rounds)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick Argon2 parameters for this host")
+    parser.add_argument("--target-ms", type=float, default=250,
+                        help="target verify latency in milliseconds (default 250)")
+    parser.add_argument("--max-memory-mb", type=int, default=64,
+                        help="memory budget per hash in MB (default 64)")
+    parser.add_argument("--parallelism", type=int, default=min(2, os.cpu_count() or 1),
+                        help="lanes per hash (default min(2, cpu count))")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="verifies measured per candidate (default 5)")
+    args = parser.parse_args()
+
+    print(f"Calibrating Argon2 for {args.target_ms:.0f} ms verify, "
+          f"<= {args.max_memory_mb} MB per hash, parallelism {args.parallelism}...")
+    params = calibrate(args.target_ms, args.max_memory_mb * 1024, args.parallelism, args.rounds)
+
+    print(f"\nVerify takes ~{params['verify_ms']:.1f} ms. Add to the environment:\n")
+    print(f"ARGON2_TIME_COST={params['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={params['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={params['parallelism']}")
+    print("\nPeak hashing memory is PASSWORD_HASH_WORKERS x "
+          f"{params['memory_cost'] // 1024} MB. Existing password hashes are "
+          "upgraded on each user's next login.")
+
+
+if __name__ == "__main__":
+    main()
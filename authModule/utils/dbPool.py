@@ -0,0 +1,97 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+# Upper bounds (seconds) of the wait-time histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0)
+
+
+class PoolMetrics:
+    """How long requests waited for a pooled connection, per process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe(self, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            for index, bound in enumerate(WAIT_BUCKETS):
+                if waited <= bound:
+                    self.buckets[index] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def stats(self):
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            labels = [f"<={bound * 1000:g}ms" for bound in WAIT_BUCKETS] + [f">{WAIT_BUCKETS[-1] * 1000:g}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / observed * 1000, 3) if observed else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "wait_histogram": dict(zip(labels, self.buckets))
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - start)
+        return connection
+
+
+def build_engine_options(pool_size, max_overflow, pool_timeout, pool_recycle, pre_ping,
+                         statement_timeout_ms, connect_timeout, external_pooler=False):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the Postgres (psycopg2) engine.
+
+    With external_pooler (PgBouncer in transaction mode and similar) the app
+    keeps no pool of its own and sends no startup parameters (no
+    application_name or options), which poolers commonly reject; set
+    statement_timeout on the database role instead (ALTER ROLE ... SET
+    statement_timeout). psycopg2 never relies on server-side prepared
+    statements, so no other changes are needed.
+    """
+    if external_pooler:
+        return {"poolclass": NullPool, "connect_args": {"connect_timeout": connect_timeout}}
+
+    connect_args = {"connect_timeout": connect_timeout, "application_name": "authModule"}
+    if statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={int(statement_timeout_ms)}"
+
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pre_ping,
+        "connect_args": connect_args
+    }
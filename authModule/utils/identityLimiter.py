@@ -0,0 +1,208 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from limits import parse
+from sqlalchemy import text
+from utils.ttlCache import TTLCache
+
+log = logging.getLogger("authModule")
+
+_ROLE_QUERY = text("""
+    SELECT us.role
+    FROM user_services us
+    JOIN services_table s ON s.id = us.service_id
+    WHERE us.user_id = :user_id AND s.name = :service AND us.enabled
+""")
+
+_NO_ROLE = object()
+
+
+def parse_role_limits(spec):
+    """
+    "Admin=6000/minute;User=600/minute;default=300/minute" -> {role: RateLimitItem}.
+    Roles without an entry use "default".
+    """
+    limits = {}
+    for part in spec.split(";"):
+        if not part.strip():
+            continue
+        role, limit = part.split("=", 1)
+        limits[role.strip()] = parse(limit.strip())
+    if "default" not in limits:
+        raise ValueError(f"Rate limit spec needs a 'default' entry: {spec}")
+    return limits
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "pending", "seen", "window")
+
+    def __init__(self, capacity, now):
+        self.tokens = float(capacity)
+        self.updated = now
+        self.pending = 0  # consumed here since the last sync
+        self.seen = 0     # fleet-wide total for `window` at the last sync
+        self.window = None
+
+
+class IdentityRateLimiter:
+    """
+    Per-identity token buckets (one per API key or user), sized by role.
+
+    hit() only touches an in-process bucket, so the request path never
+    waits on the network. Every `sync_interval` seconds a background thread
+    adds each bucket's local consumption to a shared per-window counter in
+    the rate-limit storage and drains the local bucket by what the other
+    workers consumed in the meantime. Across the fleet a quota can therefore
+    be overshot by at most one sync interval's worth of traffic.
+    """
+
+    def __init__(self, name, role_limits, get_storage, sync_interval=1.0, maxsize=100000, key_prefix=""):
+        self.name = name
+        self.role_limits = role_limits
+        self.get_storage = get_storage
+        self.sync_interval = sync_interval
+        self.maxsize = maxsize
+        self.key_prefix = key_prefix
+
+        self._buckets = OrderedDict()  # (identity, role) -> _Bucket
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        self.allowed = 0
+        self.limited = 0
+        self.sync_failures = 0
+
+    def hit(self, identity, role=None, cost=1):
+        """Take `cost` tokens; returns 0 when allowed, else seconds until it would be"""
+        limit = self.role_limits.get(role) or self.role_limits["default"]
+        capacity = limit.amount
+        rate = limit.amount / limit.get_expiry()
+        key = (str(identity), role if role in self.role_limits else "default")
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(capacity, now)
+                if len(self._buckets) > self.maxsize:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                bucket.pending += cost
+                self.allowed += 1
+                retry_after = 0
+            else:
+                self.limited += 1
+                retry_after = math.ceil((cost - bucket.tokens) / rate)
+
+        self._ensure_thread()
+        return retry_after
+
+    def stats(self):
+        return {
+            "buckets": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "sync_failures": self.sync_failures
+        }
+
+    def sync(self):
+        """Push local consumption to the shared storage and pull everyone else's"""
+        try:
+            storage = self.get_storage()
+        except Exception:
+            return  # limiter not initialised yet (or storage unavailable)
+
+        now = time.time()
+        with self._lock:
+            active = list(self._buckets.items())
+
+        for (identity, role), bucket in active:
+            limit = self.role_limits[role]
+            expiry = limit.get_expiry()
+            window = int(now // expiry)
+            with self._lock:
+                if bucket.window != window:
+                    bucket.window = window
+                    bucket.seen = 0
+                pending, bucket.pending = bucket.pending, 0
+                seen = bucket.seen
+
+            shared_key = f"{self.key_prefix}/{self.name}/{identity}/{window}"
+            try:
+                if pending:
+                    total = storage.incr(shared_key, expiry, amount=pending)
+                else:
+                    total = storage.get(shared_key)
+            except Exception as e:
+                self.sync_failures += 1
+                with self._lock:
+                    bucket.pending += pending
+                log.warning("Identity rate limit sync failed: %s", e, extra={"limiter": self.name})
+                return
+
+            others = total - seen - pending
+            with self._lock:
+                if bucket.window == window:
+                    bucket.seen = total
+                if others > 0:
+                    bucket.tokens = max(0.0, bucket.tokens - others)
+                # Forget idle buckets once they have refilled and have nothing left to report
+                refilled = bucket.tokens + (time.monotonic() - bucket.updated) * limit.amount / expiry
+                if bucket.pending == 0 and refilled >= limit.amount and self._buckets.get((identity, role)) is bucket:
+                    del self._buckets[(identity, role)]
+
+    def _ensure_thread(self):
+        # Threads do not survive a fork (gunicorn preload), so start one per process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-limit-sync", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.sync_interval)
+            try:
+                self.sync()
+            except Exception as e:
+                log.error("Identity rate limit sync crashed: %s", e, extra={"limiter": self.name})
+
+
+class ServiceRoleCache:
+    """
+    UserService.role for (user_id, service name), cached so ticket-authenticated
+    requests can pick their quota without a query per request.
+    """
+
+    def __init__(self, get_engine, maxsize=100000, ttl=60):
+        self.get_engine = get_engine
+        self._roles = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def role_for(self, user_id, service):
+        key = (user_id, service)
+        role = self._roles.get(key)
+        if role is not None:
+            return None if role is _NO_ROLE else role
+
+        try:
+            with self.get_engine().connect() as conn:
+                role = conn.execute(_ROLE_QUERY, {"user_id": user_id, "service": service}).scalar()
+        except Exception as e:
+            log.error("Service role lookup failed: %s", e, extra={"user_id": user_id, "service": service})
+            return None
+
+        self._roles.set(key, role if role is not None else _NO_ROLE)
+        return role
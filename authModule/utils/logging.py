@@ -1,8 +1,129 @@
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import os
+from env import EnvConfig
+
+# Set once per process; setup_logging() is a no-op after the first call
+_listener = None
+_queue_handler = None
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RESERVED_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+_exception_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger, msg, every extra={...}
+    field, and exc when there is a traceback.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps roughly `rate` of the INFO-and-below records logged with
+    extra={"sample": True}; everything else always passes. Kept records
+    carry sample_rate so the indexer can scale counts back up.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if not record.__dict__.pop("sample", False) or record.levelno > logging.INFO:
+            return True
+        if self.rate >= 1.0:
+            return True
+        if random.random() >= self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands records to the background listener without blocking the request
+    thread. When the queue is full the overflow policy decides:
+      drop_new    - discard the incoming record (default)
+      drop_oldest - discard the oldest queued record to make room
+      block       - wait for space (old synchronous behaviour, never drops)
+    """
+
+    def __init__(self, log_queue, overflow="drop_new"):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Interpolate %-args here (args may be mutated after the call returns)
+        # but leave the layout to the listener's formatter, keeping extras intact
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow == "drop_oldest":
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(record)
+                except queue.Full:
+                    pass
+            self.dropped += 1
+
+
+def get_logging_stats():
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0, "capacity": 0}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "dropped": _queue_handler.dropped,
+        "capacity": _queue_handler.queue.maxsize
+    }
+
 
 def setup_logging():
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
     log_dir = "logs"
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
@@ -18,15 +139,29 @@ def setup_logging():
     )
     file_handler.setLevel(logging.INFO)
 
-    formatter = logging.Formatter(
-        "%(asctime)s [%(levelname)s] %(message)s"
-    )
+    if EnvConfig.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s [%(levelname)s] %(message)s"
+        )
     file_handler.setFormatter(formatter)
 
     # Console log
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Request threads only enqueue; file writes and rotation happen on the listener thread
+    _queue_handler = BoundedQueueHandler(
+        queue.Queue(maxsize=EnvConfig.LOG_QUEUE_SIZE),
+        overflow=EnvConfig.LOG_QUEUE_OVERFLOW
+    )
+    _queue_handler.addFilter(SamplingFilter(EnvConfig.LOG_SAMPLE_RATE))
+    _listener = QueueListener(
+        _queue_handler.queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)  # drains the queue on shutdown
+
+    logger.addHandler(_queue_handler)
     logger.info("Logging is set up.")
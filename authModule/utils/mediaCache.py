@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class MediaCache:
+    """
+    Two-tier, size-bounded LRU cache for immutable media (HLS segments, images).
+    Writes go to both tiers; the memory tier holds the hottest objects and the
+    disk tier the long tail. A disk hit is promoted back into memory.
+
+    The disk directory may be shared by several workers. Each keeps its own
+    LRU index and adopts files written by the others on first access, so the
+    disk budget is enforced per process rather than globally.
+    """
+
+    def __init__(self, memory_bytes, disk_dir, disk_bytes, max_object_bytes):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self.max_object_bytes = max_object_bytes
+
+        self._memory = OrderedDict()  # key -> (body, headers)
+        self._memory_size = 0
+        self._disk = OrderedDict()  # file name -> size
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.disk_bytes:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    # -------------------------------
+    # Public API
+    # -------------------------------
+
+    def get(self, key):
+        """Returns (body, headers) or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry:
+                self.hits += 1
+                self._put_memory(key, *entry)
+            else:
+                self.misses += 1
+        return entry
+
+    def put(self, key, body, headers):
+        if len(body) > self.max_object_bytes:
+            return
+        with self._lock:
+            self._put_memory(key, body, headers)
+        if self.disk_bytes:
+            self._write_disk(key, body, headers)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_bytes": self._memory_size,
+            "memory_objects": len(self._memory),
+            "disk_bytes": self._disk_size,
+            "disk_objects": len(self._disk)
+        }
+
+    # -------------------------------
+    # Memory tier
+    # -------------------------------
+
+    def _put_memory(self, key, body, headers):
+        if len(body) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old:
+            self._memory_size -= len(old[0])
+        self._memory[key] = (body, headers)
+        self._memory_size += len(body)
+        while self._memory_size > self.memory_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    # -------------------------------
+    # Disk tier
+    # -------------------------------
+
+    def _file_name(self, key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".json") or name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+        # oldest first, so the LRU end is the least recently written
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_size += size
+
+    def _read_disk(self, key):
+        if not self.disk_bytes:
+            return None
+        name = self._file_name(key)
+        path = os.path.join(self.disk_dir, name)
+        try:
+            with open(path + ".json") as f:
+                headers = json.load(f)
+            with open(path, "rb") as f:
+                body = f.read()
+        except (FileNotFoundError, ValueError):
+            # never written, or evicted by another worker
+            return None
+
+        with self._lock:
+            if name in self._disk:
+                self._disk.move_to_end(name)
+            else:
+                self._disk[name] = len(body)
+                self._disk_size += len(body)
+        return body, headers
+
+    def _write_disk(self, key, body, headers):
+        name = self._file_name(key)
+        path = os.path.join(self.disk_dir, name)
+        try:
+            # write then rename, so readers never see a partial object
+            with open(path + ".json.tmp", "w") as f:
+                json.dump(headers, f)
+            os.replace(path + ".json.tmp", path + ".json")
+            with open(path + ".tmp", "wb") as f:
+                f.write(body)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            return
+
+        with self._lock:
+            old_size = self._disk.pop(name, None)
+            if old_size is not None:
+                self._disk_size -= old_size
+            self._disk[name] = len(body)
+            self._disk_size += len(body)
+            evicted = []
+            while self._disk_size > self.disk_bytes and self._disk:
+                evicted_name, size = self._disk.popitem(last=False)
+                self._disk_size -= size
+                evicted.append(evicted_name)
+
+        for evicted_name in evicted:
+            for suffix in ("", ".json"):
+                try:
+                    os.remove(os.path.join(self.disk_dir, evicted_name + suffix))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,97 @@
+import logging
+import time
+import uuid
+from sqlalchemy import text
+from utils.ttlCache import TTLCache
+
+log = logging.getLogger("authModule")
+
+# file_metadata / share_links belong to the Go StorageEngine, which shares this database
+_ACL_QUERY = text("""
+    SELECT f.user_id::text, s.allowed_emails::text[], s.expires_at, COALESCE(s.is_public, false)
+    FROM file_metadata f
+    LEFT JOIN share_links s
+        ON s.file_id = f.id AND (s.expires_at IS NULL OR s.expires_at > now())
+    WHERE f.id = :object_id
+""")
+_EMAIL_QUERY = text("SELECT email FROM user_table WHERE id = :user_id")
+
+_MISSING = object()
+
+
+class OwnershipIndex:
+    """
+    Local cache of who may read each stored object: its owner, the emails
+    of any active share links, or anyone while a public share is active
+    (as CheckAccess in the StorageEngine). The first request for an object loads
+    its entry with one query; every later playlist/segment/image request is
+    answered from memory. Each entry is reloaded on its own every
+    `refresh_interval` seconds (or when its earliest share expires), so
+    changes are picked up incrementally without a per-request round trip.
+    """
+
+    def __init__(self, get_engine, maxsize=100000, refresh_interval=60, negative_ttl=5):
+        self.get_engine = get_engine
+        self.negative_ttl = negative_ttl
+        self._acl = TTLCache(maxsize=maxsize, ttl=refresh_interval)
+        self._emails = TTLCache(maxsize=maxsize, ttl=refresh_interval)
+
+    def is_allowed(self, user_id, object_id):
+        acl = self._get_acl(object_id)
+        if acl is None:
+            return False
+        if acl["owner"] == user_id or acl["public"]:
+            return True
+        if not acl["allowed_emails"]:
+            return False
+        return self._get_email(user_id) in acl["allowed_emails"]
+
+    def invalidate(self, object_id):
+        self._acl.pop(object_id)
+
+    def _get_acl(self, object_id):
+        acl = self._acl.get(object_id)
+        if acl is not None:
+            return None if acl is _MISSING else acl
+
+        try:
+            uuid.UUID(object_id)
+        except ValueError:
+            return None
+
+        try:
+            with self.get_engine().connect() as conn:
+                rows = conn.execute(_ACL_QUERY, {"object_id": object_id}).fetchall()
+        except Exception as e:
+            log.error("Ownership lookup failed: %s", e, extra={"object_id": object_id})
+            return None
+
+        if not rows:
+            self._acl.set(object_id, _MISSING, expires_at=time.time() + self.negative_ttl)
+            return None
+
+        acl = {"owner": rows[0][0], "allowed_emails": set(), "public": False}
+        share_expiries = []
+        for _, allowed_emails, expires_at, is_public in rows:
+            acl["allowed_emails"].update(allowed_emails or [])
+            acl["public"] = acl["public"] or bool(is_public)
+            if expires_at is not None:
+                share_expiries.append(expires_at.timestamp())
+
+        # Drop the entry when its first share expires, so access ends on time
+        self._acl.set(object_id, acl, expires_at=min(share_expiries) if share_expiries else None)
+        return acl
+
+    def _get_email(self, user_id):
+        email = self._emails.get(user_id)
+        if email is not None:
+            return email
+        try:
+            with self.get_engine().connect() as conn:
+                email = conn.execute(_EMAIL_QUERY, {"user_id": user_id}).scalar()
+        except Exception as e:
+            log.error("User email lookup failed: %s", e, extra={"user_id": user_id})
+            return None
+        if email:
+            self._emails.set(user_id, email)
+        return email
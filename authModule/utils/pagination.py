@@ -0,0 +1,40 @@
+import base64
+import json
+from env import EnvConfig
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def page_size(raw_limit):
+    """?limit= clamped to 1..PAGE_SIZE_MAX, PAGE_SIZE_DEFAULT when missing"""
+    if raw_limit in (None, ""):
+        return EnvConfig.PAGE_SIZE_DEFAULT
+    try:
+        limit = int(raw_limit)
+    except ValueError:
+        raise InvalidCursor("limit must be an integer")
+    return max(1, min(limit, EnvConfig.PAGE_SIZE_MAX))
+
+
+def encode_cursor(*values):
+    """
+    Opaque cursor holding the sort key of the last row on a page.
+    The next page continues strictly after it, so results stay stable
+    while rows are inserted or deleted, and no OFFSET scan is needed.
+    """
+    payload = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """Sort key values (as strings) from encode_cursor; raises InvalidCursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    # Callers parse each value (datetime, UUID, ...), which only fails cleanly on strings
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(value, str) for value in values):
+        raise InvalidCursor("Invalid cursor")
+    return values
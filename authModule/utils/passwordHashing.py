@@ -1,13 +1,48 @@
 from argon2 import PasswordHasher  
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import threading
+from env import EnvConfig
 
-ph = PasswordHasher( time_cost=3,       # iterations 
-memory_cost=65536, # 64 MB RAM
-parallelism=2,     # CPU threads
+ph = PasswordHasher( time_cost=EnvConfig.ARGON2_TIME_COST,       # iterations 
+memory_cost=EnvConfig.ARGON2_MEMORY_COST, # KiB of RAM (65536 = 64 MB)
+parallelism=EnvConfig.ARGON2_PARALLELISM,     # CPU threads
 hash_len=32,       # output hash size
 salt_len=16        # random salt size
 )
 
-def hashPassword(password):
+
+class PasswordPoolBusy(Exception):
+    """Raised when the Argon2 pool is saturated; routes answer 503 instead of queueing."""
+
+
+# All Argon2 work runs on this pool so peak memory is bounded by
+# PASSWORD_HASH_WORKERS * memory_cost. argon2-cffi releases the GIL while hashing.
+_passwordExecutor = ThreadPoolExecutor(
+    max_workers=EnvConfig.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="argon2"
+)
+# running + waiting jobs; once exhausted new work is shed immediately
+_passwordSlots = threading.BoundedSemaphore(
+    EnvConfig.PASSWORD_HASH_WORKERS + EnvConfig.PASSWORD_HASH_QUEUE_DEPTH
+)
+
+
+def _submit(fn, *args):
+    if not _passwordSlots.acquire(blocking=False):
+        raise PasswordPoolBusy("Password hashing pool is saturated")
+    future = _passwordExecutor.submit(fn, *args)
+    future.add_done_callback(lambda _: _passwordSlots.release())
+    return future
+
+
+def _result(future):
+    try:
+        return future.result(timeout=EnvConfig.PASSWORD_HASH_TIMEOUT)
+    except FutureTimeoutError:
+        raise PasswordPoolBusy("Timed out waiting for the password hashing pool")
+
+
+def _hashPassword(password):
     try:
         if not isinstance(password, str) or len(password) == 0:
             print(ValueError("Password must be a non-empty string."))
@@ -19,9 +54,7 @@ def hashPassword(password):
         return None 
 
 
-
-
-def verifyPassword(stored_hash, provided_password):
+def _verifyPassword(stored_hash, provided_password):
     try:
         ph.verify(stored_hash, provided_password)
         return True
@@ -29,3 +62,92 @@ def verifyPassword(stored_hash, provided_password):
         print(f"Password verification failed: {e}")
         return False
 
+
+def hashPassword(password):
+    return _result(_submit(_hashPassword, password))
+
+
+# Bulk jobs (user import, API key issuance) hash on their own pool so they never
+# take slots from logins. Created on first use; BULK_HASH_MAX_JOBS caps how
+# many jobs share it, so peak memory stays at BULK_HASH_WORKERS * memory_cost.
+_bulkExecutor = None
+_bulkExecutorLock = threading.Lock()
+_bulkJobs = threading.BoundedSemaphore(EnvConfig.BULK_HASH_MAX_JOBS)
+
+
+class BulkHashingJob:
+    """Admission to the bulk-hashing pool; release() (or leave the with block) when the job ends."""
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._released = False
+
+    def hash(self, passwords):
+        """Hash passwords in parallel on the bulk pool, preserving order."""
+        return list(self._executor.map(ph.hash, passwords))
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            _bulkJobs.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def bulkHashingJob():
+    """Start a bulk hashing job; raises PasswordPoolBusy when BULK_HASH_MAX_JOBS are already running."""
+    global _bulkExecutor
+    if not _bulkJobs.acquire(blocking=False):
+        raise PasswordPoolBusy("Another bulk hashing job is running")
+    with _bulkExecutorLock:
+        if _bulkExecutor is None:
+            _bulkExecutor = ThreadPoolExecutor(
+                max_workers=EnvConfig.BULK_HASH_WORKERS,
+                thread_name_prefix="argon2-bulk"
+            )
+    return BulkHashingJob(_bulkExecutor)
+
+
+def verifyPassword(stored_hash, provided_password):
+    return _result(_submit(_verifyPassword, stored_hash, provided_password))
+
+
+def needsRehash(stored_hash):
+    """True when stored_hash was made with different parameters than the current ph."""
+    try:
+        return ph.check_needs_rehash(stored_hash)
+    except Exception as e:
+        print(f"Could not inspect password hash: {e}")
+        return False
+
+
+def verifyPasswords(pairs):
+    """
+    Verify a list of (stored_hash, provided_password) pairs in parallel, preserving order.
+    Work is submitted in windows of at most PASSWORD_HASH_WORKERS (fewer if other
+    requests hold slots), each finished before the next, so a batch larger than
+    the pool still completes; PasswordPoolBusy only when no slot is free at all.
+    """
+    results = []
+    position = 0
+    while position < len(pairs):
+        window = []
+        try:
+            while position < len(pairs) and len(window) < EnvConfig.PASSWORD_HASH_WORKERS:
+                stored_hash, provided_password = pairs[position]
+                window.append(_submit(_verifyPassword, stored_hash, provided_password))
+                position += 1
+        except PasswordPoolBusy:
+            if not window:
+                raise
+        try:
+            results.extend(_result(future) for future in window)
+        except PasswordPoolBusy:
+            for future in window:
+                future.cancel()
+            raise
+    return results
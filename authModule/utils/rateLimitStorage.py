@@ -0,0 +1,84 @@
+import time
+from limits.storage import MovingWindowSupport, Storage, storage_from_string
+from utils.ttlCache import TTLCache
+
+# Strategies every configured storage (including denycache+) can serve
+SUPPORTED_STRATEGIES = ("moving-window", "fixed-window")
+
+
+def check_strategy(strategy):
+    """Fail at startup instead of on the first limited request"""
+    if strategy not in SUPPORTED_STRATEGIES:
+        raise ValueError(
+            f"RATELIMIT_STRATEGY={strategy!r} is not supported; use one of {', '.join(SUPPORTED_STRATEGIES)}"
+        )
+
+
+class DenyCacheStorage(Storage, MovingWindowSupport):
+    """
+    Rate-limit storage for the moving-window strategy that wraps a shared
+    backend (redis://, memory://, ...) and remembers denials locally.
+
+    Selected with a "denycache+" prefix, e.g. RATELIMIT_STORAGE_URI=
+    "denycache+redis://redis:6379/0". Once the shared window for a key is
+    full, this worker rejects that key without a network round trip until
+    the oldest entry in the window expires. No other worker can free a slot
+    earlier, so the answer matches what the shared store would give.
+    """
+
+    STORAGE_SCHEME = [
+        "denycache+memory",
+        "denycache+redis",
+        "denycache+rediss",
+        "denycache+redis+unix",
+        "denycache+redis+cluster",
+        "denycache+redis+sentinel",
+    ]
+
+    def __init__(self, uri, wrap_exceptions=False, deny_cache_size=10000, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.shared = storage_from_string(
+            uri.split("+", 1)[1], wrap_exceptions=wrap_exceptions, **options
+        )
+        if not isinstance(self.shared, MovingWindowSupport):
+            raise ValueError(f"{uri} does not support the moving-window strategy")
+        # key -> unix time at which a slot frees up again
+        self.denied = TTLCache(maxsize=int(deny_cache_size), ttl=24 * 60 * 60)
+
+    @property
+    def base_exceptions(self):
+        return self.shared.base_exceptions
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if self.denied.get(key) is not None:
+            return False
+        if self.shared.acquire_entry(key, limit, expiry, amount):
+            return True
+        window_start, _ = self.shared.get_moving_window(key, limit, expiry)
+        free_at = window_start + expiry
+        if free_at > time.time():
+            self.denied.set(key, free_at, expires_at=free_at)
+        return False
+
+    def get_moving_window(self, key, limit, expiry):
+        return self.shared.get_moving_window(key, limit, expiry)
+
+    def incr(self, key, expiry, amount=1):
+        return self.shared.incr(key, expiry, amount)
+
+    def get(self, key):
+        return self.shared.get(key)
+
+    def get_expiry(self, key):
+        return self.shared.get_expiry(key)
+
+    def check(self):
+        return self.shared.check()
+
+    def reset(self):
+        self.denied.clear()
+        return self.shared.reset()
+
+    def clear(self, key):
+        self.denied.pop(key)
+        return self.shared.clear(key)
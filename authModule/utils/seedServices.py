@@ -3,7 +3,8 @@ Seed script to initialize default services in the database.
 This script should be run after database migration to populate initial data.
 """
 
-from app import app, db, log
+from app import create_app
+from extensions import db, log
 from database.services import ServicesModel, UserRoleEnum
 from database.organization import OrganizationModel
 from sqlalchemy.exc import IntegrityError
@@ -68,6 +69,7 @@ def seed_services():
     print("="*50 + "\n")
     
     try:
+        app = create_app()
         with app.app_context():
             # Step 1: Create default organization
             print("Step 1: Creating default organization...")
@@ -0,0 +1,59 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from env import EnvConfig
+
+_session = None
+_session_lock = threading.Lock()
+
+STORAGE_TIMEOUT = (EnvConfig.STORAGE_CONNECT_TIMEOUT, EnvConfig.STORAGE_READ_TIMEOUT)
+
+
+def _build_session():
+    session = requests.Session()
+    # Never keep cookies: the session is shared by every request thread,
+    # so it must hold no per-user state (the connection pool itself is thread-safe)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    if EnvConfig.STORAGE_PROXY_SECRET:
+        session.headers["X-Proxy-Secret"] = EnvConfig.STORAGE_PROXY_SECRET
+
+    retry = Retry(
+        total=EnvConfig.STORAGE_GET_RETRIES,
+        backoff_factor=0.1,
+        allowed_methods=frozenset(["GET", "HEAD"]),  # idempotent only, uploads are never replayed
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,  # one host: the StorageEngine
+        pool_maxsize=EnvConfig.STORAGE_POOL_SIZE,
+        max_retries=retry
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_storage_session():
+    """Process-wide keep-alive session towards the Go StorageEngine"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def storage_request(method, path, **kwargs):
+    kwargs.setdefault("timeout", STORAGE_TIMEOUT)
+    return get_storage_session().request(method, f"{EnvConfig.STORAGE_BASE_URL}{path}", **kwargs)
+
+
+def storage_get(path, **kwargs):
+    return storage_request("GET", path, **kwargs)
+
+
+def storage_post(path, **kwargs):
+    return storage_request("POST", path, **kwargs)
@@ -0,0 +1,24 @@
+"""
+What the /api/storage proxies (routes/storageProxy.py and asyncProxy.py)
+agree on with clients and the StorageEngine. No imports on purpose: the
+aiohttp proxy uses these without loading Flask or the media cache.
+"""
+
+SERVICE_NAME = "storage"
+
+# Passed through so the StorageEngine answers ranges / conditionals itself
+FORWARD_REQUEST_HEADERS = ("Range", "If-Range", "If-None-Match", "If-Modified-Since")
+FORWARD_RESPONSE_HEADERS = (
+    "Content-Length", "Content-Range", "Content-Encoding", "Accept-Ranges",
+    "ETag", "Last-Modified", "Cache-Control", "Expires"
+)
+
+# Stored with a cached object and replayed on every hit
+CACHED_RESPONSE_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+HLS_CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+}
@@ -1,7 +1,86 @@
+import base64
+import hashlib
 import json
+import struct
 import time
-from encryption.enc import encrypt, decrypt
+import uuid
+from encryption.enc import encrypt, decrypt, aead_encrypt, aead_decrypt
 from utils.kerberosUtils import is_expired
+from utils.ttlCache import TTLCache
+from env import EnvConfig
+
+
+# -------------------------------
+# Ticket Encoding
+# -------------------------------
+#
+# Compact (v2) ticket, base64url without padding:
+#   version (1 byte) || AES-GCM(nonce || ciphertext || tag), version as associated data
+# Plaintext layout (big-endian):
+#   type (1) | exp in ms (8) | user_id UUID (16) | session key (32) | service length (1) | service
+#
+# Legacy tickets are Fernet tokens wrapping JSON. Their first decoded byte is
+# always 0x80, so the two formats never collide and both validate.
+
+TICKET_VERSION_COMPACT = 0x02
+
+_TICKET_TYPES = {"TGT": 1, "SERVICE": 2}
+_TICKET_TYPE_NAMES = {v: k for k, v in _TICKET_TYPES.items()}
+_COMPACT_HEADER = struct.Struct("!BQ16s32sB")
+
+
+def _encode_compact(payload):
+    """Returns the compact ticket, or None if the payload does not fit the fixed layout"""
+    try:
+        user_id = uuid.UUID(payload["user_id"]).bytes
+        session_key = bytes.fromhex(payload["session_key"])
+        service = payload.get("service", "").encode()
+    except (ValueError, TypeError, AttributeError):
+        return None
+    if len(session_key) != 32 or len(service) > 255:
+        return None
+
+    plain = _COMPACT_HEADER.pack(
+        _TICKET_TYPES[payload["type"]],
+        int(payload["exp"] * 1000),
+        user_id,
+        session_key,
+        len(service)
+    ) + service
+
+    version = bytes([TICKET_VERSION_COMPACT])
+    sealed = version + aead_encrypt(plain, version)
+    return base64.urlsafe_b64encode(sealed).rstrip(b"=").decode()
+
+
+def _decode_compact(raw):
+    version = raw[:1]
+    plain = aead_decrypt(raw[1:], version)
+    ticket_type, exp_ms, user_id, session_key, service_len = _COMPACT_HEADER.unpack_from(plain)
+    data = {
+        "type": _TICKET_TYPE_NAMES[ticket_type],
+        "user_id": str(uuid.UUID(bytes=user_id)),
+        "session_key": session_key.hex(),
+        "exp": exp_ms / 1000
+    }
+    if ticket_type == _TICKET_TYPES["SERVICE"]:
+        data["service"] = plain[_COMPACT_HEADER.size:_COMPACT_HEADER.size + service_len].decode()
+    return data
+
+
+def _encode_ticket(payload):
+    if EnvConfig.TICKET_FORMAT == "compact":
+        ticket = _encode_compact(payload)
+        if ticket:
+            return ticket
+    return encrypt(json.dumps(payload))
+
+
+def _decode_ticket(ticket):
+    raw = base64.urlsafe_b64decode(ticket + "=" * (-len(ticket) % 4))
+    if raw[0] == TICKET_VERSION_COMPACT:
+        return _decode_compact(raw)
+    return json.loads(decrypt(ticket))
 
 
 # -------------------------------
@@ -15,7 +94,7 @@ def create_tgt(user_id, session_key, expires_in=3600):
         "session_key": session_key,
         "exp": time.time() + expires_in
     }
-    return encrypt(json.dumps(payload))
+    return _encode_ticket(payload)
 
 
 def create_service_ticket(user_id, service, session_key, expires_in=600):
@@ -26,7 +105,7 @@ def create_service_ticket(user_id, service, session_key, expires_in=600):
         "session_key": session_key,
         "exp": time.time() + expires_in
     }
-    return encrypt(json.dumps(payload))
+    return _encode_ticket(payload)
 
 
 # -------------------------------
@@ -35,7 +114,7 @@ def create_service_ticket(user_id, service, session_key, expires_in=600):
 
 def validate_tgt(tgt):
     try:
-        data = json.loads(decrypt(tgt))
+        data = _decode_ticket(tgt)
         if data["type"] != "TGT":
             return None
         if is_expired(data["exp"]):
@@ -47,7 +126,7 @@ def validate_tgt(tgt):
 
 def validate_service_ticket(ticket, expected_service):
     try:
-        data = json.loads(decrypt(ticket))
+        data = _decode_ticket(ticket)
         if data["type"] != "SERVICE":
             return None
         if data["service"] != expected_service:
@@ -57,3 +136,34 @@ def validate_service_ticket(ticket, expected_service):
         return data
     except Exception:
         return None
+
+
+# -------------------------------
+# Validated Ticket Cache
+# -------------------------------
+
+# (ticket digest, service) -> decoded payload, kept until the ticket's exp.
+# Only valid tickets are cached so garbage tickets cannot flush it.
+_service_ticket_cache = TTLCache(
+    maxsize=EnvConfig.TICKET_CACHE_SIZE,
+    ttl=EnvConfig.TICKET_CACHE_TTL
+)
+
+
+def validate_service_ticket_cached(ticket, expected_service):
+    """
+    validate_service_ticket for hot paths (storage proxy): a player reuses one
+    ticket for every playlist and segment fetch, so decrypt it once.
+    """
+    if not ticket:
+        return None
+
+    cache_key = (hashlib.sha256(ticket.encode()).digest(), expected_service)
+    data = _service_ticket_cache.get(cache_key)
+    if data:
+        return data
+
+    data = validate_service_ticket(ticket, expected_service)
+    if data:
+        _service_ticket_cache.set(cache_key, data, expires_at=data["exp"])
+    return data
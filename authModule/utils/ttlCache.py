@@ -0,0 +1,72 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache where every entry also has a deadline.
+    Entries expire after `ttl` seconds, or earlier if set() is given an
+    `expires_at` (unix timestamp) that comes first.
+
+    Expired entries are dropped lazily by get(), and a full cache evicts its
+    least recently used entry in O(1); memory is bounded by maxsize either
+    way, so no request ever pays for a scan. evict_expired() is available
+    for maintenance; it holds the lock only to copy the entries and for each
+    deletion, never for the scan itself.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (deadline, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            deadline, value = entry
+            if time.time() >= deadline:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at=None):
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._data[key] = (deadline, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry else None
+
+    def evict_expired(self):
+        """Drop expired entries; the scan runs on a snapshot, outside the lock"""
+        with self._lock:
+            snapshot = list(self._data.items())
+        now = time.time()
+        expired = [(k, entry) for k, entry in snapshot if now >= entry[0]]
+        removed = 0
+        for k, entry in expired:
+            with self._lock:
+                # Skip keys that were set again since the snapshot
+                if self._data.get(k) is entry:
+                    del self._data[k]
+                    removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)